@@ -7,9 +7,9 @@ from django.urls import reverse_lazy
 from .models import User
 from .forms import UserRegistrationForm
 from orders.models import Order
+from orders.stats import admin_dashboard_stats, user_dashboard_stats
 from products.models import Product
 from django.db.models import Sum, Count, Q
-from datetime import datetime, timedelta
 import django
 
 @login_required
@@ -24,19 +24,10 @@ def dashboard_user(request):
     """Dashboard untuk user biasa"""
     orders = Order.objects.filter(user=request.user).order_by('-created_at')[:5]
     
-    # Statistics
-    total_orders = Order.objects.filter(user=request.user).count()
-    pending_orders = Order.objects.filter(user=request.user, status='PENDING').count()
-    total_spent = Order.objects.filter(
-        user=request.user, 
-        status__in=['PAID', 'COMPLETED']
-    ).aggregate(total=Sum('total_price'))['total'] or 0
-    
+    # Statistics: satu query agregat, di-cache singkat per user (orders/stats.py)
     context = {
         'orders': orders,
-        'total_orders': total_orders,
-        'pending_orders': pending_orders,
-        'total_spent': total_spent,
+        **user_dashboard_stats(request.user),
     }
     return render(request, 'accounts/dashboard_user.html', context)
 
@@ -49,30 +40,9 @@ def dashboard_admin(request):
         return redirect('dashboard_user')
     
     try:
-        # Today's date
-        today = datetime.now().date()
-        
-        # Basic statistics
-        total_orders = Order.objects.count()
-        pending_orders = Order.objects.filter(status='PENDING').count()
-        total_users = User.objects.count()
-        
-        # Monthly revenue (last 30 days)
-        month_ago = today - timedelta(days=30)
-        month_revenue = Order.objects.filter(
-            created_at__date__gte=month_ago,
-            status__in=['PAID', 'COMPLETED']
-        ).aggregate(total=Sum('total_price'))['total'] or 0
-        
-        # Today's statistics
-        today_orders = Order.objects.filter(created_at__date=today).count()
-        today_revenue = Order.objects.filter(
-            created_at__date=today,
-            status__in=['PAID', 'COMPLETED']
-        ).aggregate(total=Sum('total_price'))['total'] or 0
-        
-        # New users today
-        new_users_today = User.objects.filter(date_joined__date=today).count()
+        # Angka penjualan dari tabel ringkasan harian (orders/rollups.py) dan
+        # jumlah stok habis, di-cache singkat (orders/stats.py)
+        summary = admin_dashboard_stats()
         
         # Stock information
         low_stock_products = Product.objects.filter(
@@ -81,36 +51,12 @@ def dashboard_admin(request):
             is_active=True
         ).order_by('stock')[:5]
         
-        out_of_stock = Product.objects.filter(
-            stock=0,
-            is_active=True
-        ).count()
-        
         # Recent orders (last 10 with user info)
         recent_orders = Order.objects.select_related('user').order_by('-created_at')[:10]
         
-        # Week revenue (optional - for completeness)
-        week_ago = today - timedelta(days=7)
-        week_revenue = Order.objects.filter(
-            created_at__date__gte=week_ago,
-            status__in=['PAID', 'COMPLETED']
-        ).aggregate(total=Sum('total_price'))['total'] or 0
-        
         context = {
-            # Basic stats
-            'total_orders': total_orders,
-            'pending_orders': pending_orders,
-            'total_users': total_users,
-            
-            # Revenue
-            'month_revenue': month_revenue,
-            'today_revenue': today_revenue,
-            'week_revenue': week_revenue,
-            
-            # Today's stats
-            'today_orders': today_orders,
-            'new_users_today': new_users_today,
-            'out_of_stock': out_of_stock,
+            # Basic stats, revenue, today's stats, out_of_stock
+            **summary,
             
             # Lists
             'low_stock_products': low_stock_products,
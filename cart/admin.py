@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Cart, CartItem
+from .models import Cart, CartItem, refresh_cart_totals
 
 class CartItemInline(admin.TabularInline):
     model = CartItem
@@ -11,9 +11,26 @@ class CartAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at', 'updated_at']
     inlines = [CartItemInline]
     search_fields = ['user__username']
+    
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        form.instance.refresh_totals()
 
 @admin.register(CartItem)
 class CartItemAdmin(admin.ModelAdmin):
     list_display = ['cart', 'product', 'quantity', 'total_price']
     list_filter = ['cart__user']
-    search_fields = ['product__name', 'cart__user__username']
\ No newline at end of file
+    search_fields = ['product__name', 'cart__user__username']
+    
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        obj.cart.refresh_totals()
+    
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        obj.cart.refresh_totals()
+    
+    def delete_queryset(self, request, queryset):
+        carts = Cart.objects.filter(pk__in=list(queryset.values_list('cart_id', flat=True)))
+        super().delete_queryset(request, queryset)
+        refresh_cart_totals(carts)
\ No newline at end of file
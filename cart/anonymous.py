@@ -0,0 +1,158 @@
+"""
+Keranjang tamu (belum login) di cookie bertanda tangan.
+
+Isi keranjang hanya ``{product_id: quantity}`` yang ditandatangani dengan
+``django.core.signing``, jadi tamu yang sekadar menjelajah tidak menulis apa
+pun ke database. Jumlah baris dibatasi ``ANONYMOUS_CART_MAX_ITEMS`` agar
+cookie tetap jauh di bawah batas 4 KB. Saat login, isinya digabung ke
+``Cart`` milik user (lihat ``merge_anonymous_cart``) dan cookie dihapus oleh
+``AnonymousCartMiddleware``.
+"""
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+
+from products.models import Product
+from .models import Cart, CartItem
+
+COOKIE_NAME = 'cart'
+COOKIE_SALT = 'cart.anonymous'
+COOKIE_MAX_AGE = 60 * 60 * 24 * 14
+
+
+def max_lines():
+    return getattr(settings, 'ANONYMOUS_CART_MAX_ITEMS', 20)
+
+
+class AnonymousCartItem:
+    """Padanan ``CartItem`` untuk template; ``id`` = id produk"""
+
+    def __init__(self, product, quantity):
+        self.id = product.id
+        self.product = product
+        self.quantity = quantity
+
+    @property
+    def total_price(self):
+        return self.product.price * self.quantity
+
+
+class AnonymousCart:
+    """Keranjang tamu dengan antarmuka yang sama dengan ``Cart`` di template"""
+
+    def __init__(self, request):
+        self.lines = self._load(request)
+        self.modified = False
+        self._items = None
+
+    @staticmethod
+    def _load(request):
+        value = request.get_signed_cookie(COOKIE_NAME, default=None, salt=COOKIE_SALT, max_age=COOKIE_MAX_AGE)
+        if not value:
+            return {}
+        try:
+            lines = [(int(product_id), int(quantity)) for product_id, quantity in json.loads(value).items()]
+        except (ValueError, TypeError, AttributeError):
+            return {}
+        return dict([line for line in lines if line[1] > 0][:max_lines()])
+
+    def _changed(self):
+        self.modified = True
+        self._items = None
+
+    def add(self, product_id, quantity):
+        """Tambah jumlah produk; ``False`` jika keranjang sudah penuh"""
+        if product_id not in self.lines and len(self.lines) >= max_lines():
+            return False
+        self.lines[product_id] = self.lines.get(product_id, 0) + quantity
+        self._changed()
+        return True
+
+    def set(self, product_id, quantity):
+        if quantity > 0:
+            self.lines[product_id] = quantity
+        else:
+            self.lines.pop(product_id, None)
+        self._changed()
+
+    def remove(self, product_id):
+        self.set(product_id, 0)
+
+    def clear(self):
+        if self.lines:
+            self.lines = {}
+            self._changed()
+
+    def get_items(self):
+        """Item beserta produknya dalam satu query; produk nonaktif dilewati"""
+        if self._items is None:
+            products = Product.objects.in_bulk([pid for pid in self.lines])
+            self._items = [
+                AnonymousCartItem(products[pid], quantity)
+                for pid, quantity in self.lines.items()
+                if pid in products and products[pid].is_active
+            ]
+        return self._items
+
+    @property
+    def total_items(self):
+        return sum(self.lines.values())
+
+    @property
+    def total_price(self):
+        return sum((item.total_price for item in self.get_items()), Decimal('0'))
+
+    def save(self, response):
+        if not self.lines:
+            response.delete_cookie(COOKIE_NAME)
+            return
+        response.set_signed_cookie(
+            COOKIE_NAME,
+            json.dumps(self.lines, separators=(',', ':')),
+            salt=COOKIE_SALT,
+            max_age=COOKIE_MAX_AGE,
+            httponly=True,
+            samesite='Lax',
+            secure=settings.SESSION_COOKIE_SECURE,
+        )
+
+
+def get_anonymous_cart(request):
+    if not hasattr(request, '_anonymous_cart'):
+        request._anonymous_cart = AnonymousCart(request)
+    return request._anonymous_cart
+
+
+def merge_anonymous_cart(request, user):
+    """
+    Gabungkan keranjang tamu ke ``Cart`` user: satu query stok, satu query
+    item yang sudah ada, lalu satu ``bulk_create`` upsert (``ON CONFLICT
+    (cart, product) DO UPDATE``). Jumlah dibatasi stok yang tersedia.
+    """
+    anonymous_cart = get_anonymous_cart(request)
+    if not anonymous_cart.lines:
+        return None
+    with transaction.atomic():
+        cart, created = Cart.objects.get_or_create(user=user)
+        stock = dict(
+            Product.objects.filter(id__in=list(anonymous_cart.lines), is_active=True, stock__gt=0)
+            .values_list('id', 'stock')
+        )
+        existing = dict(cart.items.filter(product_id__in=list(stock)).values_list('product_id', 'quantity'))
+        items = [
+            CartItem(
+                cart=cart,
+                product_id=product_id,
+                quantity=min(existing.get(product_id, 0) + quantity, stock[product_id]),
+            )
+            for product_id, quantity in anonymous_cart.lines.items()
+            if product_id in stock
+        ]
+        CartItem.objects.bulk_create(
+            items, update_conflicts=True, unique_fields=['cart', 'product'], update_fields=['quantity'],
+        )
+        cart.refresh_totals()
+    anonymous_cart.clear()
+    return cart
@@ -1,19 +1,56 @@
-from .models import Cart
+"""
+Context processor keranjang yang lazy.
+
+Nilai baru dihitung saat template benar-benar memakainya, lalu disimpan di
+request sehingga badge navbar dan sidebar keranjang berbagi satu query:
+item diambil bersama produk dan keranjangnya (``select_related``). Halaman
+yang tidak menampilkan keranjang (admin, JSON) tidak menjalankan query apa pun.
+Tamu mendapat keranjang dari cookie (``cart.anonymous``).
+"""
+from django.utils.functional import SimpleLazyObject
+
+from .anonymous import get_anonymous_cart
+from .models import Cart, CartItem
+
+
+def get_cart_items(request):
+    """Item keranjang user (beserta produk dan keranjang), dimemo per request"""
+    if not hasattr(request, '_cached_cart_items'):
+        if request.user.is_authenticated:
+            request._cached_cart_items = list(
+                CartItem.objects.filter(cart__user=request.user)
+                .select_related('cart', 'product')
+                .order_by('id')
+            )
+        else:
+            request._cached_cart_items = get_anonymous_cart(request).get_items()
+    return request._cached_cart_items
+
+
+def get_cart(request):
+    """Keranjang user tanpa membuatnya; diambil dari item bila sudah dimuat"""
+    if not hasattr(request, '_cached_cart'):
+        if not request.user.is_authenticated:
+            request._cached_cart = get_anonymous_cart(request)
+        else:
+            items = get_cart_items(request)
+            request._cached_cart = items[0].cart if items else Cart.objects.filter(user=request.user).first()
+    return request._cached_cart
+
+
+def get_cart_count(request):
+    if not request.user.is_authenticated:
+        # Cukup dari cookie, tanpa query
+        return get_anonymous_cart(request).total_items
+    items = get_cart_items(request)
+    # Keranjang kosong tidak perlu query tambahan untuk badge
+    return items[0].cart.item_count if items else 0
+
 
 def cart_context(request):
     """Context processor agar data keranjang tersedia di semua halaman (Navbar, Footer, dll)"""
-    if request.user.is_authenticated:
-        # Menggunakan get_or_create lebih ringkas daripada try-except manual
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        return {
-            'cart': cart,
-            'cart_items': cart.items.all(), # untuk akses list produk
-            'cart_items_count': cart.total_items # Menggunakan property total_items dari model Cart jika ada
-        }
-    
     return {
-        'cart': None,
-        'cart_items': [],
-        'cart_items_count': 0
-    }
\ No newline at end of file
+        'cart': SimpleLazyObject(lambda: get_cart(request)),
+        'cart_items': SimpleLazyObject(lambda: get_cart_items(request)),
+        'cart_items_count': SimpleLazyObject(lambda: get_cart_count(request)),
+    }
@@ -0,0 +1,12 @@
+class AnonymousCartMiddleware:
+    """Tulis ulang (atau hapus) cookie keranjang tamu jika isinya berubah"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        anonymous_cart = getattr(request, '_anonymous_cart', None)
+        if anonymous_cart is not None and anonymous_cart.modified:
+            anonymous_cart.save(response)
+        return response
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:02
+
+from django.db import migrations, models
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_totals(apps, schema_editor):
+    Cart = apps.get_model('cart', 'Cart')
+    CartItem = apps.get_model('cart', 'CartItem')
+    lines = CartItem.objects.filter(cart=OuterRef('pk')).order_by().values('cart')
+    money = DecimalField(max_digits=12, decimal_places=2)
+    Cart.objects.update(
+        item_count=Coalesce(Subquery(lines.annotate(total=Sum('quantity')).values('total')), 0),
+        subtotal=Coalesce(
+            Subquery(lines.annotate(total=Sum(F('quantity') * F('product__price'), output_field=money)).values('total')),
+            Value(0),
+            output_field=money,
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0002_cart_completed'),
+        ('products', '0010_product_facet_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:40
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_items(apps, schema_editor):
+    """Gabungkan baris ganda (cart, product) sebelum constraint dipasang"""
+    CartItem = apps.get_model('cart', 'CartItem')
+    duplicates = (
+        CartItem.objects.values('cart_id', 'product_id')
+        .annotate(rows=Count('id'), keep=Min('id'), total=Sum('quantity'))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    for row in duplicates:
+        CartItem.objects.filter(pk=row['keep']).update(quantity=row['total'])
+        CartItem.objects.filter(cart_id=row['cart_id'], product_id=row['product_id']).exclude(pk=row['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0003_cart_totals'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_items, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cartitem',
+            constraint=models.UniqueConstraint(fields=('cart', 'product'), name='cartitem_cart_product_uniq'),
+        ),
+    ]
@@ -1,7 +1,34 @@
-from django.db import models
+from decimal import Decimal
+
+from django.db import connection, models
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.conf import settings
+from django.utils import timezone
 from products.models import Product
 
+
+def _line_total():
+    return Sum(F('quantity') * F('product__price'), output_field=DecimalField(max_digits=12, decimal_places=2))
+
+
+def refresh_cart_totals(carts):
+    """
+    Hitung ulang ringkasan banyak keranjang dengan satu ``UPDATE`` (subquery
+    berkorelasi). Dipakai saat harga produk berubah.
+    """
+    lines = CartItem.objects.filter(cart=OuterRef('pk')).order_by().values('cart')
+    return carts.update(
+        item_count=Coalesce(Subquery(lines.annotate(total=Sum('quantity')).values('total')), 0),
+        subtotal=Coalesce(
+            Subquery(lines.annotate(total=_line_total()).values('total')),
+            Decimal('0'),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ),
+        updated_at=timezone.now(),
+    )
+
+
 class Cart(models.Model):
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL,
@@ -9,16 +36,33 @@ class Cart(models.Model):
         related_name='cart'
     )
     completed = models.BooleanField(default=False)
+    # Ringkasan denormalisasi, diperbarui lewat refresh_totals()
+    item_count = models.PositiveIntegerField(default=0, editable=False)
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     @property
     def total_price(self):
-        return sum(item.total_price for item in self.items.all())
+        return self.subtotal
     
     @property
     def total_items(self):
-        return sum(item.quantity for item in self.items.all())
+        return self.item_count
+    
+    def get_items(self):
+        return list(self.items.select_related('product').order_by('id'))
+    
+    def refresh_totals(self):
+        """Hitung ulang ringkasan dalam satu query agregat lalu simpan"""
+        totals = self.items.aggregate(count=Sum('quantity'), subtotal=_line_total())
+        self.item_count = totals['count'] or 0
+        self.subtotal = totals['subtotal'] or Decimal('0')
+        self.updated_at = timezone.now()
+        Cart.objects.filter(pk=self.pk).update(
+            item_count=self.item_count, subtotal=self.subtotal, updated_at=self.updated_at,
+        )
+        return self
     
     def __str__(self):
         return f"Cart ({self.user.username})"
@@ -28,9 +72,44 @@ class CartItem(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField(default=1)
     
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['cart', 'product'], name='cartitem_cart_product_uniq'),
+        ]
+    
     @property
     def total_price(self):
         return self.product.price * self.quantity
     
     def __str__(self):
-        return f"{self.quantity} x {self.product.name}"
\ No newline at end of file
+        return f"{self.quantity} x {self.product.name}"
+
+
+def add_cart_item(cart_id, product_id, quantity):
+    """
+    Tambah ``quantity`` produk ke keranjang dalam satu statement
+    ``INSERT ... ON CONFLICT DO UPDATE`` (PostgreSQL dan SQLite >= 3.35).
+
+    Cek stok ikut di statement yang sama: baris baru hanya disisipkan jika
+    stok >= ``quantity``, dan penambahan ke baris lama hanya terjadi jika
+    jumlah akhirnya tidak melebihi stok. Mengembalikan jumlah akhir, atau
+    ``None`` bila stok tidak mencukupi / produk tidak aktif.
+    """
+    qn = connection.ops.quote_name
+    item_table, product_table = qn(CartItem._meta.db_table), qn(Product._meta.db_table)
+    sql = f"""
+        INSERT INTO {item_table} ({qn('cart_id')}, {qn('product_id')}, {qn('quantity')})
+        SELECT %s, p.{qn('id')}, %s FROM {product_table} p
+        WHERE p.{qn('id')} = %s AND p.{qn('is_active')} = %s AND p.{qn('stock')} >= %s
+        ON CONFLICT ({qn('cart_id')}, {qn('product_id')}) DO UPDATE
+        SET {qn('quantity')} = {item_table}.{qn('quantity')} + excluded.{qn('quantity')}
+        WHERE {item_table}.{qn('quantity')} + excluded.{qn('quantity')} <= (
+            SELECT {qn('stock')} FROM {product_table} WHERE {qn('id')} = excluded.{qn('product_id')}
+        )
+        RETURNING {qn('quantity')}
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [cart_id, quantity, product_id, True, quantity])
+        row = cursor.fetchone()
+    return row[0] if row else None
+
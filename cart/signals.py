@@ -1,15 +1,43 @@
-from django.db.models.signals import post_save
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
-from django.conf import settings
-from .models import Cart
-
-@receiver(post_save, sender=settings.AUTH_USER_MODEL)
-def create_user_cart(sender, instance, created, **kwargs):
-    """Automatically create cart when new user is created"""
-    if created:
-        Cart.objects.create(user=instance)
-
-@receiver(post_save, sender=settings.AUTH_USER_MODEL)
-def save_user_cart(sender, instance, **kwargs):
-    """Save user's cart"""
-    instance.cart.save()
\ No newline at end of file
+from products.models import Product
+from .anonymous import merge_anonymous_cart
+from .models import Cart, refresh_cart_totals
+
+@receiver(user_logged_in)
+def merge_cart_on_login(sender, request, user, **kwargs):
+    """Pindahkan keranjang tamu (cookie) ke keranjang user saat login"""
+    if request is not None:
+        merge_anonymous_cart(request, user)
+
+
+@receiver(pre_save, sender=Product)
+def remember_product_price(sender, instance, raw=False, **kwargs):
+    """Catat apakah harga berubah; simpan stok/nama saja tidak menyentuh keranjang"""
+    update_fields = kwargs.get('update_fields')
+    if raw or instance.pk is None or (update_fields is not None and 'price' not in update_fields):
+        instance._price_changed = False
+        return
+    old_price = Product.objects.filter(pk=instance.pk).values_list('price', flat=True).first()
+    instance._price_changed = old_price is not None and old_price != instance.price
+
+
+@receiver(post_save, sender=Product)
+def refresh_carts_for_product(sender, instance, raw=False, **kwargs):
+    """Subtotal keranjang yang memuat produk ini mengikuti harga terbaru"""
+    if getattr(instance, '_price_changed', False):
+        refresh_cart_totals(Cart.objects.filter(items__product_id=instance.pk))
+
+
+@receiver(pre_delete, sender=Product)
+def remember_product_carts(sender, instance, **kwargs):
+    """Item keranjang ikut terhapus (CASCADE); catat keranjangnya sebelum hilang"""
+    instance._cart_ids = list(Cart.objects.filter(items__product_id=instance.pk).values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Product)
+def refresh_carts_after_product_delete(sender, instance, **kwargs):
+    cart_ids = getattr(instance, '_cart_ids', None)
+    if cart_ids:
+        refresh_cart_totals(Cart.objects.filter(pk__in=cart_ids))
@@ -5,6 +5,7 @@ from . import views
 urlpatterns = [
     path('', views.cart_detail, name='cart_detail'),
     path('add/', views.add_to_cart, name='add_to_cart'),
+    path('update/', views.update_cart, name='update_cart'),
     path('update/<int:item_id>/', views.update_cart_item, name='update_cart_item'),
     path('remove/<int:item_id>/', views.remove_from_cart, name='remove_from_cart'),
 ]
\ No newline at end of file
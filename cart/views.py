@@ -1,89 +1,246 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
+from django.template.loader import render_to_string
 from django.views.decorators.http import require_POST
 from django.contrib import messages
-from .models import Cart, CartItem
+from django.db import transaction
+from .anonymous import get_anonymous_cart
+from .context_processors import get_cart
+from .models import Cart, CartItem, add_cart_item
+from orders.reservations import available_stock, release_reservations
 from products.models import Product
 
-@login_required
 def cart_detail(request):
-    cart, created = Cart.objects.get_or_create(user=request.user)
+    # Item keranjang dimuat sekali dan dipakai bersama sidebar di base.html
+    cart = get_cart(request) or Cart.objects.get_or_create(user=request.user)[0]
     return render(request, 'cart/cart_detail.html', {'cart': cart})
 
+def available_for(request, product_ids):
+    """``{product_id: stok}`` dikurangi reservasi checkout milik user lain"""
+    user = request.user if request.user.is_authenticated else None
+    return available_stock(product_ids, exclude_user=user)
+
+def is_ajax(request):
+    return request.headers.get('x-requested-with') == 'XMLHttpRequest'
+
+def cart_json(cart, message, success=True, **extra):
+    """
+    Respons XHR keranjang: ringkasan plus fragmen ``cart_partial.html`` yang
+    dirender tanpa layout dan context processor, jadi browser tidak perlu
+    request kedua untuk menyegarkan sidebar.
+    """
+    cart_items = cart.get_items()
+    return JsonResponse({
+        'success': success,
+        'message': message,
+        'total_items': cart.total_items,
+        'total_price': str(cart.total_price),
+        'cart_html': render_to_string('cart/cart_partial.html', {'cart': cart, 'cart_items': cart_items}),
+        **extra,
+    })
+
 @require_POST
-@login_required
 def add_to_cart(request):
     product_id = request.POST.get('product_id')
     quantity = int(request.POST.get('quantity', 1))
     
     product = get_object_or_404(Product, id=product_id)
+    available = available_for(request, [product.id])[product.id]
     
-    # Check stock
-    if product.stock < quantity:
-        if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-            return JsonResponse({
-                'success': False,
-                'message': f'Stok tidak mencukupi. Stok tersedia: {product.stock}'
-            })
-        messages.error(request, f'Stok tidak mencukupi. Stok tersedia: {product.stock}')
+    def stock_error():
+        message = f'Stok tidak mencukupi. Stok tersedia: {max(available, 0)}'
+        if is_ajax(request):
+            return JsonResponse({'success': False, 'message': message})
+        messages.error(request, message)
         return redirect('product_detail', slug=product.slug)
     
-    cart, created = Cart.objects.get_or_create(user=request.user)
-    
-    cart_item, created = CartItem.objects.get_or_create(
-        cart=cart,
-        product=product,
-        defaults={'quantity': quantity}
-    )
-    
-    if not created:
-        cart_item.quantity += quantity
-        cart_item.save()
+    if not request.user.is_authenticated:
+        # Tamu: keranjang di cookie, tanpa menulis ke database
+        cart = get_anonymous_cart(request)
+        if available < cart.lines.get(product.id, 0) + quantity:
+            return stock_error()
+        if not cart.add(product.id, quantity):
+            message = 'Keranjang tamu sudah penuh. Silakan login untuk menambah produk lain.'
+            if is_ajax(request):
+                return cart_json(cart, message, success=False)
+            messages.error(request, message)
+            return redirect('cart_detail')
+    else:
+        if available < quantity:
+            return stock_error()
+        with transaction.atomic():
+            cart, created = Cart.objects.get_or_create(user=request.user)
+            # Upsert + cek stok jumlah akhir dalam satu statement
+            if add_cart_item(cart.pk, product.id, quantity) is None:
+                return stock_error()
+            cart.refresh_totals()
     
-    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-        return JsonResponse({
-            'success': True,
-            'message': 'Produk berhasil ditambahkan ke keranjang',
-            'total_items': cart.total_items,
-            'total_price': str(cart.total_price)
-        })
+    if is_ajax(request):
+        return cart_json(cart, 'Produk berhasil ditambahkan ke keranjang')
     
     messages.success(request, 'Produk berhasil ditambahkan ke keranjang')
     return redirect('cart_detail')
 
+def update_anonymous_item(request, product_id):
+    """``update_cart_item`` untuk tamu; ``product_id`` berperan sebagai id item"""
+    cart = get_anonymous_cart(request)
+    if product_id not in cart.lines:
+        raise Http404
+    product = get_object_or_404(Product, id=product_id)
+    quantity = int(request.POST.get('quantity', 1))
+    available = available_for(request, [product.id])[product.id]
+    if available < quantity:
+        message = f'Stok tidak mencukupi. Stok tersedia: {max(available, 0)}'
+        if is_ajax(request):
+            return cart_json(cart, message, success=False)
+        messages.error(request, message)
+        return redirect('cart_detail')
+    
+    cart.set(product_id, quantity)
+    message = 'Jumlah produk berhasil diubah' if quantity > 0 else 'Produk dihapus dari keranjang'
+    if is_ajax(request):
+        return cart_json(
+            cart, message,
+            removed=quantity <= 0,
+            item_total=str(product.price * quantity) if quantity > 0 else '0',
+        )
+    messages.success(request, message)
+    return redirect('cart_detail')
+
 @require_POST
-@login_required
 def update_cart_item(request, item_id):
-    cart_item = get_object_or_404(CartItem, id=item_id, cart__user=request.user)
+    if not request.user.is_authenticated:
+        return update_anonymous_item(request, item_id)
+    cart_item = get_object_or_404(
+        CartItem.objects.select_related('cart', 'product'), id=item_id, cart__user=request.user
+    )
     quantity = int(request.POST.get('quantity', 1))
+    available = available_for(request, [cart_item.product_id])[cart_item.product_id]
     
-    # Check stock
-    if cart_item.product.stock < quantity:
-        messages.error(request, f'Stok tidak mencukupi. Stok tersedia: {cart_item.product.stock}')
-        return redirect('cart_detail')
+    with transaction.atomic():
+        if 0 < quantity and available < quantity:
+            updated = 0
+        elif quantity > 0:
+            # Cek stok dan update dalam satu statement
+            updated = CartItem.objects.filter(
+                pk=cart_item.pk, product__stock__gte=quantity
+            ).update(quantity=quantity)
+            cart_item.quantity = quantity
+            message = 'Jumlah produk berhasil diubah'
+        else:
+            updated = cart_item.delete()[0]
+            release_reservations(request.user, [cart_item.product_id])
+            message = 'Produk dihapus dari keranjang'
+        if updated:
+            cart_item.cart.refresh_totals()
     
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-        messages.success(request, 'Jumlah produk berhasil diubah')
-    else:
-        cart_item.delete()
-        messages.success(request, 'Produk dihapus dari keranjang')
+    if not updated:
+        message = f'Stok tidak mencukupi. Stok tersedia: {max(available, 0)}'
+        if is_ajax(request):
+            return cart_json(cart_item.cart, message, success=False)
+        messages.error(request, message)
+        return redirect('cart_detail')
     
+    if is_ajax(request):
+        return cart_json(
+            cart_item.cart, message,
+            removed=quantity <= 0,
+            item_total=str(cart_item.total_price) if quantity > 0 else '0',
+        )
+    messages.success(request, message)
     return redirect('cart_detail')
 
 @require_POST
-@login_required
 def remove_from_cart(request, item_id):
-    cart_item = get_object_or_404(CartItem, id=item_id, cart__user=request.user)
-    cart_item.delete()
+    if not request.user.is_authenticated:
+        cart = get_anonymous_cart(request)
+        if item_id not in cart.lines:
+            raise Http404
+        cart.remove(item_id)
+        if is_ajax(request):
+            return cart_json(cart, 'Produk dihapus dari keranjang', removed=True)
+        messages.success(request, 'Produk dihapus dari keranjang')
+        return redirect('cart_detail')
+    cart_item = get_object_or_404(CartItem.objects.select_related('cart'), id=item_id, cart__user=request.user)
+    with transaction.atomic():
+        cart_item.delete()
+        release_reservations(request.user, [cart_item.product_id])
+        cart_item.cart.refresh_totals()
+    if is_ajax(request):
+        return cart_json(cart_item.cart, 'Produk dihapus dari keranjang', removed=True)
     messages.success(request, 'Produk dihapus dari keranjang')
     return redirect('cart_detail')
 
-def cart_context(request):
-    """Context processor untuk menambahkan cart ke semua template"""
-    if request.user.is_authenticated:
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        return {'cart': cart}
-    return {'cart': None}
\ No newline at end of file
+def parse_quantities(post):
+    """Ambil ``{id: jumlah}`` dari field ``quantity-<id>``; nilai tidak valid diabaikan"""
+    quantities = {}
+    for key, value in post.items():
+        if key.startswith('quantity-'):
+            try:
+                quantities[int(key[len('quantity-'):])] = max(int(value), 0)
+            except ValueError:
+                continue
+    return quantities
+
+@require_POST
+def update_cart(request):
+    """
+    Ubah banyak baris keranjang sekaligus (``quantity-<item_id>=n``; untuk tamu
+    id item = id produk). Stok semua produk dicek dengan satu query ``IN``;
+    jika ada yang kurang, tidak ada perubahan yang disimpan.
+    """
+    quantities = parse_quantities(request.POST)
+    
+    if not request.user.is_authenticated:
+        cart = get_anonymous_cart(request)
+        quantities = {pid: qty for pid, qty in quantities.items() if pid in cart.lines}
+        products = Product.objects.filter(id__in=list(quantities)).only('id', 'name', 'stock', 'price')
+        lines = {product.id: product for product in products}
+    else:
+        items = list(
+            CartItem.objects.filter(cart__user=request.user, pk__in=list(quantities)).select_related('cart', 'product')
+        )
+        cart = items[0].cart if items else Cart.objects.get_or_create(user=request.user)[0]
+        lines = {item.pk: item.product for item in items}
+    
+    available = available_for(request, [product.id for product in lines.values()])
+    shortages = [
+        f'{product.name} (tersedia {max(available[product.id], 0)})'
+        for line_id, product in lines.items()
+        if available[product.id] < quantities[line_id]
+    ]
+    if shortages:
+        message = 'Stok tidak mencukupi: ' + ', '.join(shortages)
+        if is_ajax(request):
+            return cart_json(cart, message, success=False)
+        messages.error(request, message)
+        return redirect('cart_detail')
+    
+    if not request.user.is_authenticated:
+        for product_id in lines:
+            cart.set(product_id, quantities[product_id])
+    else:
+        changed = [item for item in items if quantities[item.pk] > 0 and item.quantity != quantities[item.pk]]
+        removed = [item.pk for item in items if quantities[item.pk] == 0]
+        for item in changed:
+            item.quantity = quantities[item.pk]
+        with transaction.atomic():
+            CartItem.objects.bulk_update(changed, ['quantity'])
+            if removed:
+                CartItem.objects.filter(pk__in=removed).delete()
+                release_reservations(request.user, [lines[pk].id for pk in removed])
+            cart.refresh_totals()
+    
+    message = 'Keranjang berhasil diperbarui'
+    if is_ajax(request):
+        return cart_json(
+            cart, message,
+            items={
+                line_id: str(product.price * quantities[line_id])
+                for line_id, product in lines.items()
+                if quantities[line_id] > 0
+            },
+            removed=[line_id for line_id in lines if quantities[line_id] == 0],
+        )
+    messages.success(request, message)
+    return redirect('cart_detail')
@@ -1,3 +1,22 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.utils import timezone
 
-# Register your models here.
+from .models import Job
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'task', 'status', 'attempts', 'max_attempts', 'duration_ms', 'run_at', 'finished_at']
+    list_filter = ['status', 'task']
+    search_fields = ['task', 'last_error']
+    readonly_fields = [
+        'attempts', 'locked_by', 'locked_at', 'last_error', 'created_at',
+        'started_at', 'finished_at', 'duration_ms',
+    ]
+    actions = ['jalankan_ulang']
+
+    @admin.action(description='Masukkan kembali ke antrian')
+    def jalankan_ulang(self, request, queryset):
+        requeued = queryset.exclude(status=Job.RUNNING).update(
+            status=Job.QUEUED, attempts=0, run_at=timezone.now(), locked_by='', locked_at=None,
+        )
+        self.message_user(request, f'{requeued} job dimasukkan kembali ke antrian.', messages.SUCCESS)
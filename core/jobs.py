@@ -0,0 +1,162 @@
+"""
+Antrian pekerjaan latar belakang berbasis tabel ``core_job``.
+
+``enqueue(fungsi, *args, **kwargs)`` menyimpan nama fungsi (dotted path) dan
+argumennya (harus bisa di-JSON-kan). Karena hanya berupa INSERT biasa, job
+yang dibuat di dalam transaksi ikut batal jika transaksi gagal, dan baru
+terlihat oleh worker setelah commit.
+
+Worker (``manage.py run_worker``) mengklaim job dengan
+``SELECT ... FOR UPDATE SKIP LOCKED`` di PostgreSQL sehingga banyak proses
+bisa mengambil job bersamaan tanpa saling menunggu. SQLite tidak punya
+row lock; di sana klaim dilakukan dengan satu ``UPDATE ... WHERE id IN
+(SELECT ... LIMIT n)`` karena SQLite menulis secara serial.
+
+Job yang gagal dicoba ulang dengan exponential backoff sampai
+``max_attempts``; lama eksekusi setiap percobaan dicatat di ``duration_ms``.
+Job yang selesai lebih dari seminggu dihapus berkala oleh worker
+(``purge_finished_jobs``).
+"""
+import logging
+import random
+import time
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Avg, Count, F, Max
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+
+def task_name(func):
+    return func if isinstance(func, str) else f'{func.__module__}.{func.__qualname__}'
+
+
+def enqueue(func, *args, delay=None, max_attempts=None, **kwargs):
+    """
+    Jadwalkan ``func(*args, **kwargs)`` untuk dijalankan worker.
+
+    Dengan ``JOBS_EAGER = True`` (mis. lingkungan tanpa worker) fungsi
+    langsung dijalankan setelah transaksi aktif commit.
+    """
+    if getattr(settings, 'JOBS_EAGER', False):
+        target = import_string(task_name(func)) if isinstance(func, str) else func
+        transaction.on_commit(lambda: target(*args, **kwargs))
+        return None
+    return Job.objects.create(
+        task=task_name(func),
+        args=list(args),
+        kwargs=kwargs,
+        max_attempts=max_attempts or getattr(settings, 'JOB_MAX_ATTEMPTS', 5),
+        run_at=timezone.now() + (delay or timedelta()),
+    )
+
+
+def backoff(attempts):
+    """Jeda sebelum percobaan berikutnya: base * 2^(n-1), dibatasi, plus jitter"""
+    base = getattr(settings, 'JOB_RETRY_BASE_DELAY', 10)
+    delay = min(base * 2 ** (attempts - 1), getattr(settings, 'JOB_RETRY_MAX_DELAY', 3600))
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def claim_jobs(worker_id, limit=10):
+    """Tandai sampai ``limit`` job siap jalan sebagai milik ``worker_id`` dan kembalikan"""
+    now = timezone.now()
+    # Hostname bisa panjang (mis. nama pod); token harus muat di ``locked_by``
+    max_length = Job._meta.get_field('locked_by').max_length - 13
+    token = f'{worker_id[-max_length:]}:{uuid.uuid4().hex[:12]}'
+    ready = Job.objects.filter(status=Job.QUEUED, run_at__lte=now).order_by('run_at', 'id')
+    claim = {
+        'status': Job.RUNNING,
+        'locked_by': token,
+        'locked_at': now,
+        'attempts': F('attempts') + 1,
+    }
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(ready.select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+            if ids:
+                Job.objects.filter(id__in=ids).update(**claim)
+    else:
+        # Satu statement: atomik di SQLite yang menulis secara serial
+        Job.objects.filter(id__in=ready.values('id')[:limit], status=Job.QUEUED).update(**claim)
+    return list(Job.objects.filter(locked_by=token, status=Job.RUNNING).order_by('run_at', 'id'))
+
+
+def requeue_stale_jobs():
+    """
+    Kembalikan job yang tertinggal berstatus ``running`` (worker mati) ke
+    antrian. Job yang percobaannya sudah habis ditandai ``failed`` agar job
+    yang selalu membuat worker mati tidak diulang terus-menerus.
+    """
+    timeout = timedelta(seconds=getattr(settings, 'JOB_TIMEOUT', 15 * 60))
+    now = timezone.now()
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=now - timeout)
+    error = 'Worker berhenti saat menjalankan job'
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, locked_by='', locked_at=None, last_error=error, finished_at=now,
+    )
+    return stale.update(status=Job.QUEUED, locked_by='', locked_at=None, last_error=error)
+
+
+def run_job(job):
+    """
+    Jalankan satu job yang sudah diklaim lalu simpan hasil dan lama eksekusinya.
+
+    Mengembalikan ``None`` tanpa menjalankan apa pun jika job sudah bukan
+    milik token ini lagi (dikembalikan ke antrian karena dianggap macet
+    selama menunggu giliran dalam batch, lalu diklaim worker lain).
+    """
+    token = job.locked_by
+    mine = Job.objects.filter(pk=job.pk, status=Job.RUNNING, locked_by=token)
+    # locked_at diperbarui per job: job yang menunggu di batch panjang tidak
+    # terlihat macet begitu mulai dijalankan
+    now = timezone.now()
+    if not mine.update(locked_at=now, started_at=now):
+        return None
+    started = time.perf_counter()
+    try:
+        import_string(job.task)(*job.args, **job.kwargs)
+    except Exception:
+        duration_ms = (time.perf_counter() - started) * 1000
+        error = traceback.format_exc()
+        logger.warning('Job %s (%s) gagal pada percobaan %s', job.pk, job.task, job.attempts)
+        if job.attempts >= job.max_attempts:
+            status, run_at = Job.FAILED, job.run_at
+        else:
+            status, run_at = Job.QUEUED, timezone.now() + backoff(job.attempts)
+        # Filter token: worker yang jobnya sudah diambil alih tidak menimpa status pemilik baru
+        mine.update(
+            status=status, run_at=run_at, last_error=error, locked_by='', locked_at=None,
+            finished_at=timezone.now(), duration_ms=duration_ms,
+        )
+        return False
+    duration_ms = (time.perf_counter() - started) * 1000
+    mine.update(
+        status=Job.DONE, last_error='', locked_by='', locked_at=None,
+        finished_at=timezone.now(), duration_ms=duration_ms,
+    )
+    return True
+
+
+def job_stats(since=None):
+    """Metrik per task: jumlah per status dan rata-rata/maksimum lama eksekusi"""
+    jobs = Job.objects.all()
+    if since is not None:
+        jobs = jobs.filter(created_at__gte=since)
+    return list(
+        jobs.values('task', 'status')
+        .annotate(jobs=Count('id'), avg_ms=Avg('duration_ms'), max_ms=Max('duration_ms'))
+        .order_by('task', 'status')
+    )
+
+
+def purge_finished_jobs(older_than=timedelta(days=7)):
+    return Job.objects.filter(status=Job.DONE, finished_at__lt=timezone.now() - older_than).delete()[0]
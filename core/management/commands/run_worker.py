@@ -0,0 +1,103 @@
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.jobs import claim_jobs, job_stats, purge_finished_jobs, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = 'Jalankan worker antrian job latar belakang (lihat core/jobs.py)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help='Jumlah proses worker')
+        parser.add_argument('--batch', type=int, default=10, help='Jumlah job yang diklaim sekaligus')
+        parser.add_argument('--poll-interval', type=float, default=2.0, metavar='DETIK',
+                            help='Jeda saat antrian kosong')
+        parser.add_argument('--purge-interval', type=float, default=3600, metavar='DETIK',
+                            help='Jeda antar penghapusan job selesai yang sudah lama')
+        parser.add_argument('--once', action='store_true', help='Berhenti setelah antrian kosong')
+        parser.add_argument('--stats', action='store_true', help='Tampilkan metrik job lalu keluar')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            return self.print_stats()
+
+        processes = max(options['processes'], 1)
+        if processes == 1:
+            return self.work(options)
+
+        # Koneksi database tidak boleh diwarisi proses anak
+        connections.close_all()
+        pool = [
+            multiprocessing.Process(target=self.work, args=(options,), daemon=False)
+            for _ in range(processes)
+        ]
+        for process in pool:
+            process.start()
+        self.stdout.write(f'{processes} proses worker berjalan.')
+
+        def forward(signum, frame):
+            for process in pool:
+                if process.is_alive():
+                    os.kill(process.pid, signum)
+
+        signal.signal(signal.SIGTERM, forward)
+        signal.signal(signal.SIGINT, forward)
+        for process in pool:
+            process.join()
+
+    def work(self, options):
+        worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        stopping = False
+
+        def stop(signum, frame):
+            # Selesaikan job yang sedang berjalan, lalu keluar
+            nonlocal stopping
+            stopping = True
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        done = failed = 0
+        next_purge = time.monotonic()
+        try:
+            requeue_stale_jobs()
+            while not stopping:
+                if time.monotonic() >= next_purge:
+                    # Setiap checkout menambah job: tabel dibersihkan berkala
+                    purge_finished_jobs()
+                    next_purge = time.monotonic() + options['purge_interval']
+                jobs = claim_jobs(worker_id, options['batch'])
+                for job in jobs:
+                    result = run_job(job)
+                    if result:
+                        done += 1
+                    elif result is not None:
+                        failed += 1
+                if jobs:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+                requeue_stale_jobs()
+        finally:
+            connections.close_all()
+        self.stdout.write(f'Worker {worker_id}: {done} job selesai, {failed} gagal.')
+
+    def print_stats(self):
+        rows = job_stats()
+        if not rows:
+            self.stdout.write('Belum ada job.')
+            return
+        for row in rows:
+            avg_ms = f"{row['avg_ms']:.1f}" if row['avg_ms'] is not None else '-'
+            max_ms = f"{row['max_ms']:.1f}" if row['max_ms'] is not None else '-'
+            self.stdout.write(
+                f"{row['task']:<60} {row['status']:<8} {row['jobs']:>6} job  "
+                f"rata-rata {avg_ms} ms  maks {max_ms} ms"
+            )
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='job',
+            name='locked_by',
+            field=models.CharField(blank=True, max_length=128),
+        ),
+    ]
@@ -1,3 +1,41 @@
 from django.db import models
 
-# Create your models here.
+
+class Job(models.Model):
+    """Pekerjaan latar belakang yang dijalankan ``manage.py run_worker`` (lihat core/jobs.py)"""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Menunggu'),
+        (RUNNING, 'Berjalan'),
+        (DONE, 'Selesai'),
+        (FAILED, 'Gagal'),
+    ]
+    
+    task = models.CharField(max_length=200)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField()
+    locked_by = models.CharField(max_length=128, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Lama eksekusi percobaan terakhir, dalam milidetik
+    duration_ms = models.FloatField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            # Klaim job: WHERE status = 'queued' AND run_at <= now ORDER BY run_at
+            models.Index(fields=['status', 'run_at'], name='job_status_run_at_idx'),
+            models.Index(fields=['locked_by'], name='job_locked_by_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
@@ -0,0 +1,151 @@
+"""
+Keyset (cursor) pagination berdasarkan ``(created_at, id)``.
+
+Berbeda dengan ``paginate_by`` bawaan Django, tidak ada ``COUNT(*)`` dan
+``OFFSET``: setiap halaman adalah satu query ``WHERE (created_at, id) < cursor``
+yang memakai index, sehingga halaman ke-1000 sama cepatnya dengan halaman ke-1.
+"""
+import json
+from datetime import datetime
+
+from django.core import signing
+from django.db import connection
+from django.db.models import Q
+
+CURSOR_SALT = 'core.pagination.cursor'
+APPROXIMATE_COUNT_CAP = 1000
+
+
+def encode_cursor(obj, direction):
+    return signing.dumps([obj.created_at.isoformat(), obj.pk, direction], salt=CURSOR_SALT)
+
+
+def decode_cursor(token):
+    """Kembalikan ``(created_at, id, direction)`` atau ``None`` jika token tidak valid."""
+    try:
+        created_at, pk, direction = signing.loads(token, salt=CURSOR_SALT)
+        return datetime.fromisoformat(created_at), int(pk), direction
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+
+
+def approximate_count(queryset, cap=APPROXIMATE_COUNT_CAP):
+    """
+    Perkiraan jumlah baris tanpa full scan, sebagai ``(jumlah, terpotong)``.
+
+    Postgres: estimasi planner dari ``EXPLAIN``. Database lain: hitungan yang
+    dibatasi ``cap`` sehingga biayanya tidak tumbuh dengan ukuran tabel;
+    ``terpotong`` bernilai ``True`` jika barisnya lebih dari ``cap``.
+    """
+    queryset = queryset.order_by()
+    if connection.vendor == 'postgresql':
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows']), False
+    count = queryset[:cap + 1].count()
+    return min(count, cap), count > cap
+
+
+class CursorPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None, total=None, total_capped=False):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.total = total
+        # ``total`` hanya batas bawah (tampilkan "1000+")
+        self.total_capped = total_capped
+        self.next_query = ''
+        self.previous_query = ''
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __repr__(self):
+        return f'<CursorPage {len(self)} items>'
+
+
+class CursorPaginator:
+    """Paginator keyset, terurut dari yang terbaru (``-created_at, -id``)."""
+
+    def __init__(self, queryset, per_page, with_total=False):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.with_total = with_total
+
+    def page(self, token=None):
+        cursor = decode_cursor(token) if token else None
+        queryset = self.queryset
+
+        if cursor is None:
+            rows = list(queryset.order_by('-created_at', '-id')[:self.per_page + 1])
+            has_more, has_before = len(rows) > self.per_page, False
+            rows = rows[:self.per_page]
+        else:
+            created_at, pk, direction = cursor
+            if direction == 'prev':
+                rows = list(
+                    queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+                    .order_by('created_at', 'id')[:self.per_page + 1]
+                )
+                has_before, has_more = len(rows) > self.per_page, True
+                rows = rows[:self.per_page][::-1]
+            else:
+                rows = list(
+                    queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+                    .order_by('-created_at', '-id')[:self.per_page + 1]
+                )
+                has_more, has_before = len(rows) > self.per_page, True
+                rows = rows[:self.per_page]
+
+        next_cursor = encode_cursor(rows[-1], 'next') if rows and has_more else None
+        previous_cursor = encode_cursor(rows[0], 'prev') if rows and has_before else None
+        total, capped = approximate_count(queryset) if self.with_total else (None, False)
+        return CursorPage(rows, next_cursor, previous_cursor, total, capped)
+
+
+class CursorPaginationMixin:
+    """
+    Pengganti ``paginate_by`` untuk ListView. Template memakai
+    ``page_obj.next_query`` / ``page_obj.previous_query`` untuk link navigasi.
+    """
+
+    cursor_param = 'cursor'
+    approximate_total = False
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = CursorPaginator(queryset, page_size, with_total=self.approximate_total)
+        page = self.get_page(paginator, self.request.GET.get(self.cursor_param))
+        page.next_query = self._cursor_query(page.next_cursor)
+        page.previous_query = self._cursor_query(page.previous_cursor)
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_page(self, paginator, token):
+        return paginator.page(token)
+
+    def _cursor_query(self, cursor):
+        params = self.request.GET.copy()
+        params.pop(self.cursor_param, None)
+        if cursor:
+            params[self.cursor_param] = cursor
+        return params.urlencode()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['cursor_pagination'] = True
+        return context
@@ -5,4 +5,5 @@ from . import views
 urlpatterns = [
     path('', views.home, name='home'),
     path('search/', views.search, name='search'),
+    path('search/suggest/', views.search_suggest, name='search_suggest'),
 ]
\ No newline at end of file
@@ -1,16 +1,22 @@
 from django.shortcuts import render
-from products.models import Product, Category
-from django.db.models import Q
+from django.http import JsonResponse
+from django.views.decorators.cache import cache_control
+from django.core.paginator import Paginator
+from products.models import Product
+from products import cache as catalog_cache
+from products.featured import get_featured_products
+from products.search import SearchResults
+from products.suggest import suggest
 
 def home(request):
-    # Get featured products
-    featured_products = Product.objects.filter(is_active=True).order_by('?')[:8]
+    # Get featured products (pool yang sudah diacak, bukan order_by('?'))
+    featured_products = get_featured_products(8)
     
     # Get products by category
-    categories = Category.objects.all()
+    categories = catalog_cache.get_categories()
     
     # Get new arrivals
-    new_arrivals = Product.objects.filter(is_active=True).order_by('-created_at')[:4]
+    new_arrivals = catalog_cache.get_new_arrivals(4)
     
     context = {
         'featured_products': featured_products,
@@ -20,18 +26,30 @@ def home(request):
     return render(request, 'core/home.html', context)
 
 def search(request):
-    query = request.GET.get('q', '')
-    products = Product.objects.filter(is_active=True)
-    
+    query = request.GET.get('q', '').strip()
+
     if query:
-        products = products.filter(
-            Q(name__icontains=query) |
-            Q(description__icontains=query) |
-            Q(category__name__icontains=query)
-        )
-    
+        # Hasil terurut relevansi dari indeks pencarian (FTS5 / tsvector)
+        results = SearchResults(query)
+    else:
+        results = Product.objects.filter(is_active=True)
+
+    paginator = Paginator(results, 12)
+    page_obj = paginator.get_page(request.GET.get('page'))
+
     context = {
-        'products': products,
+        'products': page_obj.object_list,
         'query': query,
+        'page_obj': page_obj,
+        'paginator': paginator,
+        'is_paginated': page_obj.has_other_pages(),
+        'fuzzy': getattr(results, 'fuzzy', False),
     }
-    return render(request, 'products/product_list.html', context)
\ No newline at end of file
+    return render(request, 'products/product_list.html', context)
+
+
+@cache_control(public=True, max_age=60)
+def search_suggest(request):
+    """Saran pencarian (JSON) dari indeks prefix in-memory, tanpa query database"""
+    query = request.GET.get('q', '')[:50]
+    return JsonResponse({'q': query, 'results': suggest(query)})
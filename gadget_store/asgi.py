@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gadget_store.settings')
 
 application = get_asgi_application()
+
+# Indeks saran pencarian dibangun di background sebelum request pertama
+from products.suggest import warm_up  # noqa: E402
+
+warm_up()
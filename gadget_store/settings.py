@@ -34,6 +34,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'cart.middleware.AnonymousCartMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -68,6 +69,25 @@ DATABASES = {
     )
 }
 
+# Cache: Redis di produksi (isi REDIS_URL, butuh paket redis), LocMem untuk development lokal.
+# Cache katalog berversi ada di products/cache.py
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'gadget-store',
+        }
+    }
+CATALOG_CACHE_TIMEOUT = 60 * 15
+# Cache angka dashboard per user; dihapus setiap ada penulisan pesanan (lihat orders/stats.py)
+DASHBOARD_STATS_TIMEOUT = 60
 
 AUTH_PASSWORD_VALIDATORS = [{'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'}, {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'}, {'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator'}, {'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator'}]
 
@@ -92,6 +112,49 @@ LOGIN_URL = '/accounts/login/'
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
 
+# Pencarian produk (lihat products/search.py)
+SEARCH_FUZZY_FALLBACK = True
+SEARCH_FUZZY_THRESHOLD = 0.3
+
+# Turunan gambar produk (lihat products/images.py). Set False di lingkungan
+# tanpa process pool (mis. serverless) agar gambar dirender langsung, atau
+# 'queue' agar dirender oleh worker antrian job.
+IMAGE_DERIVATIVES_ASYNC = True
+IMAGE_WORKERS = 2
+
+# Jumlah produk dalam pool unggulan beranda (lihat products/featured.py)
+FEATURED_POOL_SIZE = 48
+
+# Kapasitas indeks produk terkait per produk (lihat products/related.py)
+RELATED_CAPACITY = 20
+
+# Jumlah nomor pesanan yang dicadangkan sekaligus per proses (lihat
+# orders/models.py). 1 = nomor selalu berurutan tanpa celah antar-proses.
+ORDER_NUMBER_BLOCK_SIZE = 1
+
+# Lama stok ditahan untuk pembeli yang membuka checkout, dalam detik
+# (lihat orders/reservations.py)
+STOCK_RESERVATION_TTL = 60 * 10
+
+# Antrian job latar belakang (lihat core/jobs.py, jalankan
+# `manage.py run_worker`). Isi env JOBS_EAGER=1 di lingkungan tanpa worker
+# (mis. Vercel) agar job dijalankan langsung setelah commit.
+JOBS_EAGER = os.environ.get('JOBS_EAGER') == '1'
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BASE_DELAY = 10
+JOB_RETRY_MAX_DELAY = 60 * 60
+# Job berstatus running lebih lama dari ini dianggap ditinggal workernya
+JOB_TIMEOUT = 60 * 15
+
+# Bukti pembayaran (lihat orders/receipts.py): batas ukuran unggahan dalam
+# byte, sisi terpanjang setelah dikompres, dan lebar preview untuk admin
+RECEIPT_MAX_UPLOAD_SIZE = 15 * 1024 * 1024
+RECEIPT_MAX_DIMENSION = 1600
+RECEIPT_PREVIEW_WIDTH = 320
+
+# Batas jumlah produk di keranjang tamu (cookie, lihat cart/anonymous.py)
+ANONYMOUS_CART_MAX_ITEMS = 20
+
 # Konfigurasi Tambahan untuk Vercel (Produksi)
 if not DEBUG:
     # Mengambil host spesifik dari domain Anda
@@ -14,4 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gadget_store.settings')
 
 application = get_wsgi_application()
+
+# Indeks saran pencarian dibangun di background sebelum request pertama
+from products.suggest import warm_up  # noqa: E402
+
+warm_up()
 app = application
\ No newline at end of file
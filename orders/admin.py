@@ -1,5 +1,8 @@
 from django.contrib import admin, messages
-from .models import Order, OrderItem
+from django.utils.html import format_html
+from .events import set_order_status
+from .models import DailySalesRollup, Order, OrderEvent, OrderItem, StockReservation
+from .rollups import record_orders_changed
 
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
@@ -8,6 +11,17 @@ class OrderItemInline(admin.TabularInline):
     readonly_fields = ['product', 'quantity', 'price']
     can_delete = False # Mencegah penghapusan item pesanan secara tidak sengaja
 
+class OrderEventInline(admin.TabularInline):
+    model = OrderEvent
+    extra = 0
+    fields = ['created_at', 'from_status', 'status', 'actor']
+    readonly_fields = fields
+    ordering = ['created_at', 'id']
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     # Menambahkan payment_method agar admin tahu cara bayar user (COD/Transfer)
@@ -15,25 +29,51 @@ class OrderAdmin(admin.ModelAdmin):
     list_filter = ['status', 'payment_method', 'created_at']
     list_editable = ['status']
     search_fields = ['order_number', 'user__username']
-    readonly_fields = ['order_number', 'user', 'created_at', 'updated_at']
-    inlines = [OrderItemInline]
+    readonly_fields = ['order_number', 'user', 'created_at', 'updated_at', 'bukti_pembayaran']
+    inlines = [OrderItemInline, OrderEventInline]
     
     # Menambahkan fitur Action untuk konfirmasi cepat secara massal
     actions = ['konfirmasi_pembayaran', 'tandai_dikirim', 'tandai_selesai']
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # Perubahan status dari form/list_editable juga masuk riwayat
+        if change and 'status' in form.changed_data:
+            OrderEvent.objects.create(
+                order=obj, from_status=form.initial.get('status', ''), status=obj.status, actor=request.user,
+            )
+        if change and {'status', 'total_price'} & set(form.changed_data):
+            record_orders_changed([(
+                obj.created_at,
+                form.initial.get('status', obj.status),
+                form.initial.get('total_price', obj.total_price),
+                obj.status,
+                obj.total_price,
+            )])
+
+    @admin.display(description='Bukti pembayaran')
+    def bukti_pembayaran(self, obj):
+        # Preview kecil; klik untuk membuka file lengkap
+        if not obj.payment_receipt:
+            return '-'
+        return format_html(
+            '<a href="{}" target="_blank"><img src="{}" style="max-height: 240px;" loading="lazy"></a>',
+            obj.payment_receipt.url, obj.receipt_preview_url,
+        )
+
     @admin.action(description='Konfirmasi: Tandai pesanan sudah DIBAYAR')
     def konfirmasi_pembayaran(self, request, queryset):
-        updated = queryset.update(status='PAID')
+        updated = set_order_status(queryset, 'PAID', actor=request.user)
         self.message_user(request, f'{updated} pesanan berhasil dikonfirmasi sebagai PAID.', messages.SUCCESS)
 
     @admin.action(description='Tandai pesanan sudah DIKIRIM')
     def tandai_dikirim(self, request, queryset):
-        updated = queryset.update(status='SHIPPED')
+        updated = set_order_status(queryset, 'SHIPPED', actor=request.user)
         self.message_user(request, f'{updated} pesanan diubah ke SHIPPED.', messages.INFO)
 
     @admin.action(description='Tandai pesanan SELESAI')
     def tandai_selesai(self, request, queryset):
-        updated = queryset.update(status='COMPLETED')
+        updated = set_order_status(queryset, 'COMPLETED', actor=request.user)
         self.message_user(request, f'{updated} pesanan diselesaikan.', messages.SUCCESS)
 
     fieldsets = (
@@ -44,10 +84,49 @@ class OrderAdmin(admin.ModelAdmin):
             'fields': ('shipping_address',)
         }),
         ('Pembayaran', {
-            'fields': ('total_price', 'payment_method')
+            'fields': ('total_price', 'payment_method', 'bukti_pembayaran')
         }),
         ('Metadata', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
         })
-    )
\ No newline at end of file
+    )
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ['product', 'user', 'quantity', 'expires_at', 'created_at']
+    list_select_related = ['product', 'user']
+    search_fields = ['product__name', 'user__username']
+    raw_id_fields = ['product', 'user']
+
+
+@admin.register(OrderEvent)
+class OrderEventAdmin(admin.ModelAdmin):
+    list_display = ['order', 'from_status', 'status', 'actor', 'created_at']
+    list_filter = ['status', 'created_at']
+    list_select_related = ['order', 'actor']
+    search_fields = ['order__order_number']
+
+    # Riwayat hanya ditambah oleh aplikasi, tidak diubah dari admin
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailySalesRollup)
+class DailySalesRollupAdmin(admin.ModelAdmin):
+    list_display = ['day', 'orders', 'revenue', 'paid_revenue', 'completed_revenue', 'pending_orders', 'new_users']
+    date_hierarchy = 'day'
+
+    # Diisi otomatis; perbaiki dengan `manage.py rebuild_sales_rollup`
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
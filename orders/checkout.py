@@ -0,0 +1,178 @@
+"""
+Proses checkout: keranjang -> pesanan dalam satu transaksi.
+
+Stok dipotong dengan ``UPDATE ... SET stock = stock - q WHERE stock >= q``
+per produk, berurutan menurut id produk. Baris produk terkunci oleh UPDATE
+itu sendiri sampai commit, sehingga dua checkout bersamaan tidak bisa
+menjual stok yang sama (oversell), dan urutan yang tetap mencegah deadlock.
+Jika satu produk gagal, seluruh transaksi dibatalkan.
+
+Sebelum transaksi dibuka, stok keranjang ditahan lewat reservasi TTL
+(``orders/reservations.py``) sehingga kegagalan karena stok sudah diputuskan
+lebih awal dengan query murah.
+"""
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from cart.models import CartItem
+from core.jobs import enqueue
+from products.cache import forget_stock_changes
+from products.models import Product
+from products.related import record_co_purchase
+from .models import IdempotencyKey, Order, OrderEvent, OrderItem, StockReservation, next_order_number
+from .reservations import reserve_lines
+
+SHIPPING_FEE = 15000
+SERVICE_FEE = 2000
+COD_FEE = 5000
+
+# Kunci idempotensi lebih tua dari ini dianggap kedaluwarsa dan boleh dihapus
+IDEMPOTENCY_WINDOW = timedelta(hours=24)
+
+
+class CheckoutError(Exception):
+    pass
+
+
+class EmptyCart(CheckoutError):
+    def __init__(self):
+        super().__init__('Keranjang Anda kosong!')
+
+
+class OutOfStock(CheckoutError):
+    def __init__(self, product, requested, available=None):
+        self.product = product
+        self.requested = requested
+        self.available = product.stock if available is None else available
+        super().__init__(
+            f'Stok {product.name} tidak mencukupi. '
+            f'Stok tersedia: {self.available}, '
+            f'Jumlah diminta: {requested}'
+        )
+
+
+def order_fees(payment_method):
+    return SHIPPING_FEE + SERVICE_FEE + (COD_FEE if payment_method == 'cod' else 0)
+
+
+def cart_lines(user):
+    return list(
+        CartItem.objects.filter(cart__user=user).select_related('cart', 'product').order_by('product_id')
+    )
+
+
+def hold_cart(user, lines=None):
+    """Tahan stok semua baris keranjang; ``OutOfStock`` jika ada yang tidak cukup"""
+    lines = cart_lines(user) if lines is None else lines
+    if not lines:
+        raise EmptyCart()
+    shortages = reserve_lines(user, lines)
+    if shortages:
+        line, available = shortages[0]
+        raise OutOfStock(line.product, line.quantity, available)
+    return lines
+
+
+def replayed_order(user, idempotency_key):
+    """Pesanan yang sudah dibuat dengan kunci ini (POST yang dikirim ulang), atau ``None``"""
+    if not idempotency_key:
+        return None
+    row = (
+        IdempotencyKey.objects.filter(
+            user=user,
+            key=idempotency_key,
+            order__isnull=False,
+            created_at__gte=timezone.now() - IDEMPOTENCY_WINDOW,
+        )
+        .select_related('order')
+        .first()
+    )
+    return row.order if row else None
+
+
+def prune_idempotency_keys():
+    return IdempotencyKey.objects.filter(created_at__lt=timezone.now() - IDEMPOTENCY_WINDOW).delete()[0]
+
+
+def place_order(user, shipping_address, payment_method, idempotency_key=None):
+    """
+    Buat pesanan dari keranjang ``user``. Melempar ``EmptyCart`` atau
+    ``OutOfStock``; keranjang tidak berubah jika checkout gagal.
+
+    Dengan ``idempotency_key``, kiriman ulang dengan kunci yang sama
+    mengembalikan pesanan pertama tanpa menyentuh stok atau keranjang.
+    """
+    order = replayed_order(user, idempotency_key)
+    if order is not None:
+        return order
+
+    # Stok ditahan di transaksi pendek terpisah: pembeli yang kalah cepat
+    # gagal di sini, sebelum transaksi checkout dibuka
+    lines = hold_cart(user)
+
+    # Nomor diambil di luar transaksi agar bisa memakai blok nomor per proses
+    order_number = next_order_number()
+    try:
+        order = _create_order(user, lines, order_number, shipping_address, payment_method, idempotency_key)
+    except IntegrityError:
+        # Kiriman paralel dengan kunci yang sama: tunggu yang pertama, pakai pesanannya
+        order = replayed_order(user, idempotency_key)
+        if order is None:
+            raise
+    return order
+
+
+def _create_order(user, lines, order_number, shipping_address, payment_method, idempotency_key):
+    now = timezone.now()
+    with transaction.atomic():
+        if idempotency_key:
+            # Kunci sama yang sudah kedaluwarsa tapi belum dipangkas bukan
+            # kiriman ulang: hapus agar tidak bentrok dengan unique constraint
+            IdempotencyKey.objects.filter(
+                user=user, key=idempotency_key, created_at__lt=now - IDEMPOTENCY_WINDOW,
+            ).delete()
+            # Ditulis pertama: kiriman kedua tertahan di unique constraint
+            # sebelum sempat memotong stok
+            key = IdempotencyKey.objects.create(user=user, key=idempotency_key)
+        for line in lines:
+            decremented = Product.objects.filter(pk=line.product_id, stock__gte=line.quantity).update(
+                stock=F('stock') - line.quantity, updated_at=now,
+            )
+            if not decremented:
+                line.product.refresh_from_db(fields=['stock'])
+                raise OutOfStock(line.product, line.quantity)
+
+        subtotal = sum(line.product.price * line.quantity for line in lines)
+        order = Order.objects.create(
+            user=user,
+            order_number=order_number,
+            shipping_address=shipping_address,
+            total_price=subtotal + order_fees(payment_method),
+            payment_method=payment_method,
+        )
+        OrderEvent.objects.create(order=order, status=order.status, actor=user, created_at=now)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product_id=line.product_id, quantity=line.quantity, price=line.product.price)
+            for line in lines
+        ])
+
+        if idempotency_key:
+            key.order = order
+            key.save(update_fields=['order'])
+        StockReservation.objects.filter(user=user).delete()
+
+        # Kosongkan keranjang setelah berhasil checkout
+        CartItem.objects.filter(pk__in=[line.pk for line in lines]).delete()
+        lines[0].cart.refresh_totals()
+
+        # UPDATE stok tidak memicu signal: hanya cache yang bergantung pada
+        # stok yang dibuang, cache katalog lainnya tetap dipakai.
+        # Indeks "sering dibeli bersama" diperbarui worker; job ikut batal
+        # bersama transaksi ini jika checkout gagal.
+        slugs = [line.product.slug for line in lines]
+        transaction.on_commit(lambda: forget_stock_changes(slugs))
+        enqueue(record_co_purchase, [line.product_id for line in lines])
+    return order
@@ -0,0 +1,78 @@
+"""
+Riwayat status pesanan (``OrderEvent``) dan feed-nya.
+
+Setiap perubahan ``Order.status`` lewat ``set_order_status`` menulis satu
+baris event per pesanan dengan satu ``bulk_create``, dalam transaksi yang
+sama dengan UPDATE statusnya (ringkasan harian di orders/rollups.py ikut
+diperbarui). Tabel hanya ditambah sehingga analitik bisa
+membacanya secara inkremental lewat ``event_feed`` (keyset ``(created_at,
+id)`` menaik) tanpa memindai ulang tabel ``Order``.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from core.pagination import decode_cursor, encode_cursor
+from .models import Order, OrderEvent
+from .rollups import record_orders_changed
+from .stats import invalidate_order_stats
+
+FEED_MAX_LIMIT = 500
+
+# Event yang lebih muda dari ini belum dikirim di feed: transaksi yang
+# dimulai lebih awal tetapi commit belakangan tidak terlewat oleh pembaca
+# yang menyimpan cursor terakhir
+FEED_SETTLE_DELAY = timedelta(seconds=5)
+
+
+def set_order_status(orders, status, actor=None):
+    """
+    Ubah status ``orders`` (queryset atau daftar id) dan catat event-nya.
+    Pesanan yang statusnya sudah ``status`` dilewati. Mengembalikan jumlah
+    pesanan yang berubah.
+    """
+    if not isinstance(orders, QuerySet):
+        orders = Order.objects.filter(pk__in=orders)
+    now = timezone.now()
+    with transaction.atomic():
+        changed = list(
+            orders.exclude(status=status).select_for_update().order_by('pk')
+            .values_list('pk', 'status', 'created_at', 'total_price', 'user_id')
+        )
+        if not changed:
+            return 0
+        Order.objects.filter(pk__in=[pk for pk, *_ in changed]).update(status=status, updated_at=now)
+        OrderEvent.objects.bulk_create([
+            OrderEvent(order_id=pk, from_status=from_status, status=status, actor=actor, created_at=now)
+            for pk, from_status, *_ in changed
+        ])
+        record_orders_changed(
+            (created_at, from_status, total, status, total) for pk, from_status, created_at, total, user_id in changed
+        )
+        user_ids = [user_id for *_, user_id in changed]
+        transaction.on_commit(lambda: invalidate_order_stats(user_ids))
+    return len(changed)
+
+
+def event_feed(cursor=None, status=None, limit=100):
+    """
+    Satu halaman event setelah ``cursor``, dari yang terlama. Mengembalikan
+    ``(events, next_cursor)``; ``next_cursor`` tetap berisi posisi terakhir
+    walaupun halaman kosong sehingga pembaca cukup mengulang dengan cursor itu.
+    """
+    limit = max(1, min(int(limit), FEED_MAX_LIMIT))
+    events = OrderEvent.objects.filter(created_at__lte=timezone.now() - FEED_SETTLE_DELAY)
+    if status:
+        events = events.filter(status=status)
+    position = decode_cursor(cursor) if cursor else None
+    if position is None:
+        cursor = None
+    else:
+        created_at, pk, _ = position
+        events = events.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+    rows = list(events.order_by('created_at', 'id')[:limit])
+    if rows:
+        cursor = encode_cursor(rows[-1], 'next')
+    return rows, cursor
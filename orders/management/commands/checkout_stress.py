@@ -0,0 +1,126 @@
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, close_old_connections, connection
+
+from cart.models import Cart, CartItem
+from orders.checkout import OutOfStock, place_order
+from orders.models import Order
+from orders.rollups import record_users_joined
+from products.models import Category, Product
+
+
+class Command(BaseCommand):
+    help = (
+        'Uji beban checkout paralel: banyak user berebut satu produk dengan stok '
+        'terbatas. Memastikan tidak ada oversell dan mengukur checkout/detik.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help='Jumlah pembeli (satu checkout per pembeli)')
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--stock', type=int, default=100, help='Stok awal produk uji')
+        parser.add_argument('--quantity', type=int, default=1, help='Jumlah per checkout')
+        parser.add_argument('--keep', action='store_true', help='Jangan hapus data uji setelah selesai')
+
+    def handle(self, *args, **options):
+        # Command ini membuat lalu menghapus user, produk, dan pesanan sungguhan
+        if not settings.DEBUG:
+            raise CommandError('checkout_stress hanya boleh dijalankan di lingkungan pengembangan (DEBUG=True).')
+        if options['threads'] > 1 and connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING(
+                'SQLite mengunci seluruh database saat menulis; hasil paralel tidak mewakili PostgreSQL.'
+            ))
+        run_id = uuid.uuid4().hex[:8]
+        product, users = self.prepare(run_id, options)
+        try:
+            results, elapsed = self.run(users, options['threads'])
+            self.report(product, results, elapsed, options)
+        finally:
+            if not options['keep']:
+                self.cleanup(product, users)
+
+    def prepare(self, run_id, options):
+        category, created = Category.objects.get_or_create(slug='stress-test', defaults={'name': 'Stress Test'})
+        product = Product.objects.create(
+            category=category,
+            name=f'Stress Test {run_id}',
+            slug=f'stress-test-{run_id}',
+            price=1000,
+            stock=options['stock'],
+            is_active=False,
+        )
+        User = get_user_model()
+        users = User.objects.bulk_create([
+            User(username=f'stress-{run_id}-{index}') for index in range(options['users'])
+        ])
+        if not users[0].pk:
+            users = list(User.objects.filter(username__startswith=f'stress-{run_id}-'))
+        # bulk_create tidak memicu post_save; cleanup menghapus lewat queryset
+        # yang memicu post_delete, jadi ringkasan harian dicatat manual di sini
+        record_users_joined(users)
+        carts = Cart.objects.bulk_create([Cart(user=user) for user in users])
+        if not carts[0].pk:
+            carts = list(Cart.objects.filter(user__in=users))
+        CartItem.objects.bulk_create([
+            CartItem(cart=cart, product=product, quantity=options['quantity']) for cart in carts
+        ])
+        return product, users
+
+    def run(self, users, threads):
+        queue = list(users)
+        lock = threading.Lock()
+        results = Counter()
+
+        def worker():
+            while True:
+                with lock:
+                    if not queue:
+                        break
+                    user = queue.pop()
+                try:
+                    place_order(user, 'Stress test', 'bank_transfer')
+                    outcome = 'ok'
+                except OutOfStock:
+                    outcome = 'out_of_stock'
+                except DatabaseError as exc:
+                    outcome = f'db_error: {exc.__class__.__name__}: {exc}'
+                with lock:
+                    results[outcome] += 1
+            close_old_connections()
+            connection.close()
+
+        started = time.perf_counter()
+        pool = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        return results, time.perf_counter() - started
+
+    def report(self, product, results, elapsed, options):
+        product.refresh_from_db()
+        orders = Order.objects.filter(items__product=product).distinct().count()
+        sold = options['quantity'] * results['ok']
+        for outcome, count in sorted(results.items()):
+            self.stdout.write(f'{outcome}: {count}')
+        self.stdout.write(
+            f'{results["ok"]} checkout dalam {elapsed:.2f} detik '
+            f'({results["ok"] / max(elapsed, 0.001):.1f} checkout/detik), '
+            f'stok {options["stock"]} -> {product.stock}'
+        )
+        if product.stock < 0 or product.stock != options['stock'] - sold or orders != results['ok']:
+            raise CommandError(
+                f'Oversell/inkonsistensi: stok akhir {product.stock}, terjual {sold}, pesanan {orders}'
+            )
+        self.stdout.write(self.style.SUCCESS('Tidak ada oversell.'))
+
+    def cleanup(self, product, users):
+        Order.objects.filter(user__in=users).delete()
+        get_user_model().objects.filter(pk__in=[user.pk for user in users]).delete()
+        product.delete()
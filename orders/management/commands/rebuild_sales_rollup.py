@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from orders.rollups import rebuild_sales_rollup
+
+
+class Command(BaseCommand):
+    help = (
+        'Hitung ulang tabel ringkasan penjualan harian dari data pesanan dan user '
+        '(untuk pengisian awal atau memperbaiki selisih)'
+    )
+
+    def handle(self, *args, **options):
+        days = rebuild_sales_rollup()
+        self.stdout.write(self.style.SUCCESS(f'Ringkasan penjualan {days} hari dibangun ulang.'))
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from orders.checkout import prune_idempotency_keys
+from orders.reservations import sweep_expired_reservations
+
+
+class Command(BaseCommand):
+    help = (
+        'Hapus reservasi stok dan kunci idempotensi checkout yang sudah kedaluwarsa '
+        '(jalankan berkala, mis. via cron)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', type=int, metavar='DETIK', help='Ulangi terus setiap N detik')
+
+    def handle(self, *args, **options):
+        while True:
+            deleted = sweep_expired_reservations()
+            keys = prune_idempotency_keys()
+            self.stdout.write(f'{deleted} reservasi dan {keys} kunci idempotensi kedaluwarsa dihapus.')
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:20
+
+from django.db import migrations, models
+
+
+def seed_counters(apps, schema_editor):
+    """Lanjutkan dari nomor terbesar yang sudah terpakai per hari"""
+    Order = apps.get_model('orders', 'Order')
+    OrderNumberCounter = apps.get_model('orders', 'OrderNumberCounter')
+    last_values = {}
+    for order_number in Order.objects.filter(order_number__startswith='ORD').values_list('order_number', flat=True).iterator():
+        try:
+            day = f'{order_number[3:7]}-{order_number[7:9]}-{order_number[9:11]}'
+            value = int(order_number[11:])
+        except ValueError:
+            continue
+        last_values[day] = max(value, last_values.get(day, 0))
+    OrderNumberCounter.objects.bulk_create([
+        OrderNumberCounter(day=day, last_value=value) for day, value in last_values.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_order_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderNumberCounter',
+            fields=[
+                ('day', models.DateField(primary_key=True, serialize=False)),
+                ('last_value', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
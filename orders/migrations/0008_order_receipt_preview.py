@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='payment_receipt_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='payment_receipt_preview',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='receipts/previews/'),
+        ),
+    ]
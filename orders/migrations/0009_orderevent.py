@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:38
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def backfill_events(apps, schema_editor):
+    """
+    Pesanan lama: event PENDING saat dibuat, dan status sekarang pada
+    updated_at (perkiraan terbaik karena riwayat aslinya tidak tersimpan)
+    """
+    Order = apps.get_model('orders', 'Order')
+    OrderEvent = apps.get_model('orders', 'OrderEvent')
+    batch = []
+    for pk, status, created_at, updated_at in Order.objects.values_list(
+        'pk', 'status', 'created_at', 'updated_at'
+    ).iterator():
+        batch.append(OrderEvent(order_id=pk, status='PENDING', created_at=created_at))
+        if status != 'PENDING':
+            batch.append(OrderEvent(order_id=pk, from_status='PENDING', status=status, created_at=updated_at))
+        if len(batch) >= 1000:
+            OrderEvent.objects.bulk_create(batch)
+            batch = []
+    OrderEvent.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('orders', '0008_order_receipt_preview'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, max_length=20)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('PAID', 'Paid'), ('SHIPPED', 'Shipped'), ('COMPLETED', 'Completed'), ('CANCELLED', 'Cancelled')], max_length=20)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='orders.order')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at', 'id'], name='orderevent_status_created_idx'), models.Index(fields=['created_at', 'id'], name='orderevent_created_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_events, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:40
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def backfill_rollup(apps, schema_editor):
+    """Isi ringkasan dari pesanan dan user yang sudah ada (sama dengan rebuild_sales_rollup)"""
+    Order = apps.get_model('orders', 'Order')
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    DailySalesRollup = apps.get_model('orders', 'DailySalesRollup')
+    tzinfo = timezone.get_current_timezone()
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f'LOCK TABLE {connection.ops.quote_name(DailySalesRollup._meta.db_table)} IN EXCLUSIVE MODE'
+        )
+    DailySalesRollup.objects.all().delete()
+
+    rows = defaultdict(dict)
+    grouped = (
+        Order.objects.annotate(day=TruncDate('created_at', tzinfo=tzinfo))
+        .values('day', 'status')
+        .annotate(count=Count('id'), total=Sum('total_price'))
+        .order_by()
+    )
+    for group in grouped:
+        values = rows[group['day']]
+        prefix = group['status'].lower()
+        values['orders'] = values.get('orders', 0) + group['count']
+        values['revenue'] = values.get('revenue', 0) + group['total']
+        values[f'{prefix}_orders'] = group['count']
+        values[f'{prefix}_revenue'] = group['total']
+    users = (
+        User.objects.annotate(day=TruncDate('date_joined', tzinfo=tzinfo))
+        .values('day')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    for group in users:
+        rows[group['day']]['new_users'] = group['count']
+
+    DailySalesRollup.objects.bulk_create(
+        [DailySalesRollup(day=day, **values) for day, values in sorted(rows.items())],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('orders', '0009_orderevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('day', models.DateField(primary_key=True, serialize=False)),
+                ('orders', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('new_users', models.IntegerField(default=0)),
+                ('pending_orders', models.IntegerField(default=0)),
+                ('pending_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('paid_orders', models.IntegerField(default=0)),
+                ('paid_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('shipped_orders', models.IntegerField(default=0)),
+                ('shipped_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('completed_orders', models.IntegerField(default=0)),
+                ('completed_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cancelled_orders', models.IntegerField(default=0)),
+                ('cancelled_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+        ),
+        migrations.RunPython(backfill_rollup, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,89 @@
-from django.db import models
+import threading
+
+from django.db import connection, models
 from django.conf import settings
+from django.utils import timezone
 from products.models import Product
-from datetime import datetime
+
+
+class OrderNumberCounter(models.Model):
+    """Penghitung nomor pesanan per hari; dinaikkan dengan satu upsert atomik"""
+    day = models.DateField(primary_key=True)
+    last_value = models.PositiveBigIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.day}: {self.last_value}"
+
+
+def reserve_order_numbers(day, count=1):
+    """
+    Cadangkan ``count`` nomor untuk ``day`` dengan satu statement
+    ``INSERT ... ON CONFLICT DO UPDATE ... RETURNING`` (tanpa baca terpisah).
+    Mengembalikan nomor terakhir dari blok yang dicadangkan.
+    """
+    qn = connection.ops.quote_name
+    table = qn(OrderNumberCounter._meta.db_table)
+    sql = f"""
+        INSERT INTO {table} ({qn('day')}, {qn('last_value')}) VALUES (%s, %s)
+        ON CONFLICT ({qn('day')}) DO UPDATE
+        SET {qn('last_value')} = {table}.{qn('last_value')} + excluded.{qn('last_value')}
+        RETURNING {qn('last_value')}
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [day, count])
+        return cursor.fetchone()[0]
+
+
+_number_blocks = {}
+_number_lock = threading.Lock()
+
+
+def next_order_number(day=None):
+    """
+    Nomor pesanan berikutnya: ``ORD`` + ``YYYYMMDD`` + urutan (minimal 4 digit).
+
+    Di luar transaksi, tiap proses mengambil blok ``ORDER_NUMBER_BLOCK_SIZE``
+    nomor sekaligus sehingga baris penghitung jarang disentuh. Di dalam
+    transaksi hanya satu nomor yang dicadangkan: jika transaksi dibatalkan,
+    cadangan ikut batal dan tidak ada blok basi yang tersimpan di memori.
+    """
+    day = day or timezone.localdate()
+    if connection.in_atomic_block:
+        number = reserve_order_numbers(day)
+    else:
+        with _number_lock:
+            block = _number_blocks.get(day)
+            if block is None or block[0] > block[1]:
+                size = max(getattr(settings, 'ORDER_NUMBER_BLOCK_SIZE', 1), 1)
+                last = reserve_order_numbers(day, size)
+                _number_blocks.clear()
+                block = _number_blocks[day] = [last - size + 1, last]
+            number = block[0]
+            block[0] += 1
+    return f'ORD{day:%Y%m%d}{number:04d}'
+
+
+class StockReservation(models.Model):
+    """Stok yang ditahan sementara untuk checkout seorang user (TTL)"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='stock_reservations')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reservations')
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'product'], name='reservation_user_product_uniq'),
+        ]
+        indexes = [
+            # SUM(quantity) reservasi aktif per produk, dan sweeper
+            models.Index(fields=['product', 'expires_at'], name='reservation_product_exp_idx'),
+            models.Index(fields=['expires_at'], name='reservation_expires_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.quantity} x {self.product_id} untuk {self.user_id} s/d {self.expires_at}"
+
 
 class Order(models.Model):
     STATUS_CHOICES = [
@@ -28,24 +110,29 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     payment_receipt = models.ImageField(upload_to='receipts/', blank=True, null=True)
+    # Varian kecil untuk verifikasi admin dan SHA-256 file yang diunggah (lihat orders/receipts.py)
+    payment_receipt_preview = models.ImageField(upload_to='receipts/previews/', blank=True, null=True, editable=False)
+    payment_receipt_hash = models.CharField(max_length=64, blank=True, editable=False)
+    
+    class Meta:
+        indexes = [
+            # Keyset pagination (created_at, id) untuk daftar pesanan
+            models.Index(fields=['-created_at', '-id'], name='order_created_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='order_user_created_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='order_status_created_idx'),
+        ]
     
     def __str__(self):
         return f"Order #{self.order_number}"
     
+    @property
+    def receipt_preview_url(self):
+        receipt = self.payment_receipt_preview or self.payment_receipt
+        return receipt.url if receipt else ''
+    
     def save(self, *args, **kwargs):
         if not self.order_number:
-            # Generate order number: ORD + YYYYMMDD + sequence
-            date_str = datetime.now().strftime('%Y%m%d')
-            last_order = Order.objects.filter(order_number__startswith=f'ORD{date_str}').order_by('order_number').last()
-            if last_order:
-                try:
-                    last_num = int(last_order.order_number[-4:])
-                    new_num = last_num + 1
-                except ValueError:
-                    new_num = 1
-            else:
-                new_num = 1
-            self.order_number = f'ORD{date_str}{new_num:04d}'
+            self.order_number = next_order_number()
         super().save(*args, **kwargs)
 
 class OrderItem(models.Model):
@@ -59,4 +146,70 @@ class OrderItem(models.Model):
         return self.price * self.quantity
     
     def __str__(self):
-        return f"{self.quantity} x {self.product.name}"
\ No newline at end of file
+        return f"{self.quantity} x {self.product.name}"
+
+
+class OrderEvent(models.Model):
+    """Riwayat perubahan status pesanan; hanya ditambah, tidak pernah diubah (lihat orders/events.py)"""
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='events')
+    from_status = models.CharField(max_length=20, blank=True)
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    actor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        indexes = [
+            # "Berapa pesanan PAID dalam rentang waktu" dan feed per status
+            models.Index(fields=['status', 'created_at', 'id'], name='orderevent_status_created_idx'),
+            # Feed tanpa filter, keyset (created_at, id)
+            models.Index(fields=['created_at', 'id'], name='orderevent_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.order_id}: {self.from_status or '-'} -> {self.status}"
+
+
+class DailySalesRollup(models.Model):
+    """
+    Ringkasan penjualan per hari (tanggal pesanan dibuat) untuk dashboard
+    admin. Diperbarui inkremental oleh orders/rollups.py; bangun ulang
+    dengan ``manage.py rebuild_sales_rollup``.
+    """
+    day = models.DateField(primary_key=True)
+    orders = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    new_users = models.IntegerField(default=0)
+    # Jumlah dan nilai pesanan hari itu menurut status saat ini
+    pending_orders = models.IntegerField(default=0)
+    pending_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    paid_orders = models.IntegerField(default=0)
+    paid_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    shipped_orders = models.IntegerField(default=0)
+    shipped_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    completed_orders = models.IntegerField(default=0)
+    completed_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cancelled_orders = models.IntegerField(default=0)
+    cancelled_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    
+    def __str__(self):
+        return f"{self.day}: {self.orders} pesanan"
+
+
+class IdempotencyKey(models.Model):
+    """Kunci idempotensi POST checkout: kirim ulang form mengembalikan pesanan yang sama"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    key = models.CharField(max_length=64)
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, null=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='idempotency_user_key_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['created_at'], name='idempotency_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.key} -> {self.order_id}"
+
@@ -0,0 +1,154 @@
+"""
+Unggahan bukti pembayaran.
+
+``ReceiptUploadHandler`` menulis upload per chunk ke file sementara sambil
+menghitung SHA-256 dan ukurannya; upload yang melewati
+``RECEIPT_MAX_UPLOAD_SIZE`` dihentikan sebelum sisanya ditulis ke disk.
+
+File disimpan dengan nama berdasarkan hash-nya, jadi unggahan ulang file yang
+sama tidak menulis apa pun. Foto asli (sering 8-12 MB dari kamera ponsel)
+diperkecil dan di-encode ulang ke JPEG oleh worker antrian job
+(``process_receipt``), bersama varian preview kecil untuk admin.
+"""
+import hashlib
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import StopUpload, TemporaryFileUploadHandler
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from core.jobs import enqueue
+from .models import Order
+
+RECEIPT_DIR = 'receipts'
+ORIGINAL_DIR = 'receipts/originals'
+PREVIEW_DIR = 'receipts/previews'
+
+
+def max_upload_size():
+    return getattr(settings, 'RECEIPT_MAX_UPLOAD_SIZE', 15 * 1024 * 1024)
+
+
+class InvalidReceipt(Exception):
+    pass
+
+
+class ReceiptUploadHandler(TemporaryFileUploadHandler):
+    """Tulis upload ke file sementara per chunk, hitung hash, dan batasi ukurannya"""
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.too_large = False
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # Content-Length sudah terlalu besar: jangan buat file sementara sama sekali
+        if content_length > max_upload_size() + 64 * 1024:
+            self.too_large = True
+
+    def new_file(self, *args, **kwargs):
+        if self.too_large:
+            raise StopUpload()
+        super().new_file(*args, **kwargs)
+        self.sha256 = hashlib.sha256()
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > max_upload_size():
+            self.too_large = True
+            self.file.close()
+            raise StopUpload()
+        self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        uploaded.sha256 = self.sha256.hexdigest()
+        return uploaded
+
+
+def receipt_names(digest):
+    return f'{RECEIPT_DIR}/{digest}.jpg', f'{PREVIEW_DIR}/{digest}.jpg'
+
+
+def ingest_receipt(order, uploaded):
+    """
+    Pasang bukti pembayaran ``uploaded`` (dari ``ReceiptUploadHandler``) ke
+    ``order``. Mengembalikan ``False`` jika file identik sudah terpasang.
+    """
+    digest = getattr(uploaded, 'sha256', None)
+    if digest is None:
+        sha256 = hashlib.sha256()
+        for chunk in uploaded.chunks():
+            sha256.update(chunk)
+        digest = sha256.hexdigest()
+    if digest == order.payment_receipt_hash:
+        return False
+
+    receipt_name, preview_name = receipt_names(digest)
+    if default_storage.exists(receipt_name) and default_storage.exists(preview_name):
+        # File yang sama pernah diproses (pesanan lain / unggahan sebelumnya)
+        Order.objects.filter(pk=order.pk).update(
+            payment_receipt=receipt_name, payment_receipt_preview=preview_name, payment_receipt_hash=digest,
+        )
+        return True
+
+    try:
+        uploaded.seek(0)
+        with Image.open(uploaded) as image:
+            image.verify()
+            extension = image.format.lower()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as error:
+        raise InvalidReceipt('File bukti pembayaran bukan gambar yang valid.') from error
+
+    original_name = f'{ORIGINAL_DIR}/{digest}.{extension}'
+    if not default_storage.exists(original_name):
+        uploaded.seek(0)
+        original_name = default_storage.save(original_name, uploaded)
+    Order.objects.filter(pk=order.pk).update(
+        payment_receipt=original_name, payment_receipt_preview=None, payment_receipt_hash=digest,
+    )
+    enqueue(process_receipt, order.pk, digest)
+    return True
+
+
+def render_receipt(data, max_dimension, preview_width):
+    """Perkecil dan encode ulang ke JPEG; mengembalikan ``(bukti, preview)`` dalam bytes"""
+    with Image.open(BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original).convert('RGB')
+    image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+    receipt = BytesIO()
+    image.save(receipt, 'JPEG', quality=80, optimize=True, progressive=True)
+
+    image.thumbnail((preview_width, preview_width * 2), Image.LANCZOS)
+    preview = BytesIO()
+    image.save(preview, 'JPEG', quality=70, optimize=True)
+    return receipt.getvalue(), preview.getvalue()
+
+
+def process_receipt(order_id, digest):
+    """Job antrian: kompres bukti pembayaran asli dan buat varian preview"""
+    order = Order.objects.filter(pk=order_id, payment_receipt_hash=digest).first()
+    if order is None:
+        # Sudah diganti unggahan yang lebih baru
+        return
+    receipt_name, preview_name = receipt_names(digest)
+    original_name = order.payment_receipt.name
+    if not (default_storage.exists(receipt_name) and default_storage.exists(preview_name)):
+        with default_storage.open(original_name, 'rb') as source:
+            receipt, preview = render_receipt(
+                source.read(),
+                getattr(settings, 'RECEIPT_MAX_DIMENSION', 1600),
+                getattr(settings, 'RECEIPT_PREVIEW_WIDTH', 320),
+            )
+        for name, data in ((receipt_name, receipt), (preview_name, preview)):
+            if not default_storage.exists(name):
+                default_storage.save(name, ContentFile(data))
+
+    Order.objects.filter(pk=order_id, payment_receipt_hash=digest).update(
+        payment_receipt=receipt_name, payment_receipt_preview=preview_name,
+    )
+    if original_name != receipt_name and not Order.objects.filter(payment_receipt=original_name).exists():
+        default_storage.delete(original_name)
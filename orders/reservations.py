@@ -0,0 +1,119 @@
+"""
+Reservasi stok berjangka waktu (TTL) untuk checkout.
+
+Membuka halaman checkout menahan jumlah tiap baris keranjang selama
+``STOCK_RESERVATION_TTL`` detik. Stok tersedia = ``stock`` dikurangi jumlah
+reservasi aktif milik user lain, dihitung dengan satu ``SUM`` di atas index
+``(product, expires_at)``. Pembeli yang kalah cepat langsung ditolak saat
+membuka checkout, bukan di dalam transaksi checkout.
+
+Keranjang memakai ``available_stock`` untuk cek stok saat menambah/mengubah
+jumlah, dan ``release_reservations`` saat produk dihapus dari keranjang
+sehingga stok yang ditahan langsung kembali untuk pembeli lain.
+
+Reservasi kedaluwarsa diabaikan oleh semua query di sini; sweeper
+(``manage.py release_expired_reservations``) hanya membersihkan barisnya.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from products.models import Product
+from .models import StockReservation
+
+
+def reservation_ttl():
+    return timedelta(seconds=getattr(settings, 'STOCK_RESERVATION_TTL', 600))
+
+
+def held_quantities(product_ids, exclude_user=None, now=None):
+    """``{product_id: jumlah}`` reservasi aktif, opsional tanpa milik ``exclude_user``"""
+    holds = StockReservation.objects.filter(product_id__in=product_ids, expires_at__gt=now or timezone.now())
+    if exclude_user is not None:
+        holds = holds.exclude(user=exclude_user)
+    return dict(holds.values('product_id').annotate(total=Sum('quantity')).values_list('product_id', 'total'))
+
+
+def available_stock(product_ids, exclude_user=None):
+    """``{product_id: stok - reservasi aktif}``"""
+    held = held_quantities(product_ids, exclude_user)
+    return {
+        product_id: stock - held.get(product_id, 0)
+        for product_id, stock in Product.objects.filter(id__in=product_ids).values_list('id', 'stock')
+    }
+
+
+def reserve_lines(user, lines):
+    """
+    Tahan stok untuk baris keranjang ``lines`` (``CartItem`` dengan produk).
+
+    Baris produk dikunci berurutan (``select_for_update``) agar dua user tidak
+    menahan stok yang sama. Reservasi user yang sudah ada diperpanjang; yang
+    tidak lagi ada di keranjang dilepas. Mengembalikan daftar
+    ``(line, tersedia)`` untuk baris yang tidak bisa ditahan; jika ada, tidak
+    ada reservasi yang disimpan.
+    """
+    now = timezone.now()
+    product_ids = sorted(line.product_id for line in lines)
+    with transaction.atomic():
+        # Reservasi produk yang tidak lagi ada di keranjang dilepas lebih dulu.
+        # Di SQLite statement tulis pertama ini juga langsung mengambil lock
+        # tulis, sehingga transaksi tidak gagal saat upgrade lock baca -> tulis.
+        StockReservation.objects.filter(user=user).exclude(product_id__in=product_ids).delete()
+        stock = dict(
+            Product.objects.select_for_update().filter(id__in=product_ids).order_by('id').values_list('id', 'stock')
+        )
+        held = held_quantities(product_ids, exclude_user=user, now=now)
+        shortages = []
+        for line in lines:
+            available = stock.get(line.product_id, 0) - held.get(line.product_id, 0)
+            if available < line.quantity:
+                shortages.append((line, max(available, 0)))
+        if shortages:
+            return shortages
+
+        StockReservation.objects.bulk_create(
+            [
+                StockReservation(
+                    user=user,
+                    product_id=line.product_id,
+                    quantity=line.quantity,
+                    expires_at=now + reservation_ttl(),
+                )
+                for line in lines
+            ],
+            update_conflicts=True,
+            unique_fields=['user', 'product'],
+            update_fields=['quantity', 'expires_at'],
+        )
+    return []
+
+
+def reservation_expiry(user):
+    """Waktu berakhir reservasi aktif user (untuk ditampilkan), atau ``None``"""
+    return (
+        StockReservation.objects.filter(user=user, expires_at__gt=timezone.now())
+        .order_by('expires_at').values_list('expires_at', flat=True).first()
+    )
+
+
+def release_reservations(user, product_ids=None):
+    """Lepas reservasi ``user`` (hanya ``product_ids`` jika diberikan), mis. saat produk dihapus dari keranjang"""
+    holds = StockReservation.objects.filter(user=user)
+    if product_ids is not None:
+        holds = holds.filter(product_id__in=product_ids)
+    return holds.delete()[0]
+
+
+def sweep_expired_reservations(batch_size=5000):
+    """Hapus reservasi kedaluwarsa per batch; mengembalikan jumlah baris terhapus"""
+    now = timezone.now()
+    deleted = 0
+    while True:
+        ids = list(StockReservation.objects.filter(expires_at__lte=now).values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += StockReservation.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,165 @@
+"""
+Ringkasan penjualan harian (``DailySalesRollup``) untuk dashboard admin.
+
+Setiap pesanan dihitung pada baris tanggal dibuatnya. Pembuatan, perubahan
+status/total, dan penghapusan pesanan serta user baru menambah/mengurangi
+kolom yang bersangkutan dengan satu ``INSERT ... ON CONFLICT (day) DO
+UPDATE SET kolom = kolom + delta`` per hari, sehingga dashboard cukup
+menjumlahkan beberapa baris per hari, berapa pun jumlah pesanannya.
+
+Pembuatan pesanan dicatat setelah commit agar checkout tidak menahan kunci
+baris hari ini sampai transaksinya selesai. Jika ada yang terlewat (mis.
+proses mati di antara commit dan pembaruan), ``manage.py
+rebuild_sales_rollup`` menghitung ulang semuanya dari tabel sumber.
+
+Penting: jalur massal yang tidak memicu signal (``bulk_create``,
+``QuerySet.update()`` pada status/total, ``raw`` fixture) tidak tercatat.
+Kode seperti itu harus memanggil ``record_*`` di bawah sendiri (lihat
+``set_order_status`` dan command ``checkout_stress``), atau jalankan rebuild
+setelahnya. ``QuerySet.delete()`` tetap memicu ``post_delete`` per baris.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailySalesRollup, Order
+
+COUNTER_FIELDS = [field.name for field in DailySalesRollup._meta.concrete_fields if not field.primary_key]
+
+
+def status_fields(status):
+    prefix = status.lower()
+    return f'{prefix}_orders', f'{prefix}_revenue'
+
+
+def apply_deltas(deltas):
+    """``deltas``: ``{tanggal: {kolom: selisih}}``; satu upsert per tanggal, urut tanggal"""
+    deltas = {day: values for day, values in deltas.items() if any(values.values())}
+    if not deltas:
+        return
+    qn = connection.ops.quote_name
+    table = qn(DailySalesRollup._meta.db_table)
+    columns = ', '.join(qn(name) for name in COUNTER_FIELDS)
+    placeholders = ', '.join(['%s'] * (len(COUNTER_FIELDS) + 1))
+    updates = ', '.join(f'{qn(name)} = {table}.{qn(name)} + excluded.{qn(name)}' for name in COUNTER_FIELDS)
+    sql = (
+        f'INSERT INTO {table} ({qn("day")}, {columns}) VALUES ({placeholders}) '
+        f'ON CONFLICT ({qn("day")}) DO UPDATE SET {updates}'
+    )
+    rows = [[day] + [values.get(name, 0) for name in COUNTER_FIELDS] for day, values in sorted(deltas.items())]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+def _order_deltas(deltas, day, status, total, sign):
+    orders_field, revenue_field = status_fields(status)
+    values = deltas[day]
+    values['orders'] = values.get('orders', 0) + sign
+    values['revenue'] = values.get('revenue', 0) + sign * total
+    values[orders_field] = values.get(orders_field, 0) + sign
+    values[revenue_field] = values.get(revenue_field, 0) + sign * total
+
+
+def record_orders_created(orders, sign=1):
+    deltas = defaultdict(dict)
+    for order in orders:
+        _order_deltas(deltas, timezone.localdate(order.created_at), order.status, order.total_price, sign)
+    apply_deltas(deltas)
+
+
+def record_orders_deleted(orders):
+    record_orders_created(orders, sign=-1)
+
+
+def record_orders_changed(changes):
+    """``changes``: iterable ``(created_at, status_lama, total_lama, status_baru, total_baru)``"""
+    deltas = defaultdict(dict)
+    for created_at, old_status, old_total, new_status, new_total in changes:
+        day = timezone.localdate(created_at)
+        _order_deltas(deltas, day, old_status, old_total, -1)
+        _order_deltas(deltas, day, new_status, new_total, 1)
+    apply_deltas(deltas)
+
+
+def record_users_joined(users, sign=1):
+    deltas = defaultdict(dict)
+    for user in users:
+        values = deltas[timezone.localdate(user.date_joined)]
+        values['new_users'] = values.get('new_users', 0) + sign
+    apply_deltas(deltas)
+
+
+def rebuild_sales_rollup():
+    """
+    Hitung ulang seluruh tabel dari ``Order`` dan ``User`` (dua query GROUP BY).
+
+    Agregasi dan penggantian isi tabel berjalan dalam satu transaksi yang
+    mengunci tabel ringkasan, sehingga ``apply_deltas`` dari proses lain
+    menunggu sampai rebuild commit lalu diterapkan di atas hasil baru (tidak
+    hilang dan tidak bentrok dengan insert rebuild).
+    """
+    tzinfo = timezone.get_current_timezone()
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'LOCK TABLE {connection.ops.quote_name(DailySalesRollup._meta.db_table)} IN EXCLUSIVE MODE'
+                )
+        # Di SQLite, DELETE sebagai statement pertama langsung mengambil kunci tulis
+        DailySalesRollup.objects.all().delete()
+
+        rows = defaultdict(dict)
+        grouped = (
+            Order.objects.annotate(day=TruncDate('created_at', tzinfo=tzinfo))
+            .values('day', 'status')
+            .annotate(count=Count('id'), total=Sum('total_price'))
+            .order_by()
+        )
+        for group in grouped:
+            values = rows[group['day']]
+            orders_field, revenue_field = status_fields(group['status'])
+            values['orders'] = values.get('orders', 0) + group['count']
+            values['revenue'] = values.get('revenue', 0) + group['total']
+            values[orders_field] = group['count']
+            values[revenue_field] = group['total']
+        users = (
+            get_user_model().objects.annotate(day=TruncDate('date_joined', tzinfo=tzinfo))
+            .values('day')
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        for group in users:
+            rows[group['day']]['new_users'] = group['count']
+
+        DailySalesRollup.objects.bulk_create(
+            [DailySalesRollup(day=day, **values) for day, values in sorted(rows.items())],
+            batch_size=500,
+        )
+    return len(rows)
+
+
+def sales_summary(today=None):
+    """Angka dashboard admin dalam satu query agregat atas tabel ringkasan"""
+    today = today or timezone.localdate()
+    # Pendapatan = pesanan yang sudah dibayar atau selesai
+    revenue = F('paid_revenue') + F('completed_revenue')
+    summary = DailySalesRollup.objects.aggregate(
+        total_orders=Sum('orders'),
+        pending_orders=Sum('pending_orders'),
+        total_users=Sum('new_users'),
+        month_revenue=Sum(revenue, filter=Q(day__gte=today - timedelta(days=30))),
+        week_revenue=Sum(revenue, filter=Q(day__gte=today - timedelta(days=7))),
+        today_revenue=Sum(revenue, filter=Q(day=today)),
+        today_orders=Sum('orders', filter=Q(day=today)),
+        new_users_today=Sum('new_users', filter=Q(day=today)),
+    )
+    return {
+        key: value if value is not None else (Decimal('0') if key.endswith('revenue') else 0)
+        for key, value in summary.items()
+    }
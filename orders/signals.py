@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Order
+from .rollups import record_orders_created, record_orders_deleted, record_users_joined
+from .stats import invalidate_order_stats
+
+
+@receiver(post_save, sender=Order)
+def rollup_order_created(sender, instance, created, raw=False, **kwargs):
+    """Tambahkan pesanan baru ke ringkasan harian setelah transaksi commit"""
+    if created and not raw:
+        transaction.on_commit(lambda: record_orders_created([instance]))
+
+
+@receiver(post_delete, sender=Order)
+def rollup_order_deleted(sender, instance, **kwargs):
+    transaction.on_commit(lambda: record_orders_deleted([instance]))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def rollup_user_joined(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        transaction.on_commit(lambda: record_users_joined([instance]))
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def rollup_user_deleted(sender, instance, **kwargs):
+    transaction.on_commit(lambda: record_users_joined([instance], sign=-1))
+
+
+# Didaftarkan setelah receiver ringkasan di atas sehingga callback on_commit
+# ini berjalan setelah ringkasan diperbarui
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def invalidate_stats_on_order_write(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: invalidate_order_stats([instance.user_id]))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_stats_on_user_write(sender, instance, created=True, raw=False, **kwargs):
+    # Hanya user baru/dihapus yang mengubah angka dashboard admin
+    if created and not raw:
+        transaction.on_commit(lambda: invalidate_order_stats([]))
@@ -0,0 +1,82 @@
+"""
+Statistik dashboard user dan admin.
+
+Angka setiap dashboard dihitung dengan satu query agregat bersyarat
+(``Count(..., filter=Q(...))`` / ``Sum(..., filter=...)``), bukan satu query
+per angka, dan hanya angka yang ditampilkan dashboard yang dihitung. Angka
+per tanggal dashboard admin berasal dari ringkasan harian (orders/rollups.py).
+
+Hasil di-cache sebentar (``DASHBOARD_STATS_TIMEOUT``) per user. Penulisan
+pesanan (signal ``Order`` dan ``set_order_status``) menghapus cache user
+yang bersangkutan dan cache dashboard admin setelah commit.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+
+from products.cache import catalog_version, make_key, stock_version
+from products.models import Product
+from .models import Order
+from .rollups import sales_summary
+
+PAID_STATUSES = ['PAID', 'COMPLETED']
+LOW_STOCK_THRESHOLD = 10
+ADMIN_KEY = 'stats:admin'
+
+
+def stats_timeout():
+    return getattr(settings, 'DASHBOARD_STATS_TIMEOUT', 60)
+
+
+def user_key(user_id):
+    return f'stats:user:{user_id}'
+
+
+def order_stats(orders):
+    """Jumlah pesanan, pesanan pending, dan total belanja dari queryset ``orders`` dalam satu query"""
+    return orders.aggregate(
+        total_orders=Count('id'),
+        pending_orders=Count('id', filter=Q(status='PENDING')),
+        revenue=Coalesce(Sum('total_price', filter=Q(status__in=PAID_STATUSES)), Decimal('0')),
+    )
+
+
+def user_dashboard_stats(user):
+    def compute():
+        stats = order_stats(Order.objects.filter(user=user))
+        return {
+            'total_orders': stats['total_orders'],
+            'pending_orders': stats['pending_orders'],
+            'total_spent': stats['revenue'],
+        }
+
+    return cache.get_or_set(user_key(user.pk), compute, stats_timeout())
+
+
+def stock_stats():
+    """Jumlah produk aktif yang habis dan yang stoknya menipis, satu query"""
+    return Product.objects.filter(is_active=True).aggregate(
+        out_of_stock=Count('id', filter=Q(stock=0)),
+        low_stock=Count('id', filter=Q(stock__gt=0, stock__lt=LOW_STOCK_THRESHOLD)),
+    )
+
+
+def admin_dashboard_stats():
+    """
+    Angka dashboard admin: penjualan dari ringkasan harian (orders/rollups.py)
+    dan stok produk. Key ikut versi katalog dan versi stok sehingga perubahan
+    stok langsung terlihat.
+    """
+    def compute():
+        return {**sales_summary(), **stock_stats()}
+
+    return cache.get_or_set(make_key(ADMIN_KEY, catalog_version(), stock_version()), compute, stats_timeout())
+
+
+def invalidate_order_stats(user_ids):
+    keys = [user_key(user_id) for user_id in set(user_ids)]
+    keys.append(make_key(ADMIN_KEY, catalog_version(), stock_version()))
+    cache.delete_many(keys)
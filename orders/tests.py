@@ -1,3 +1,111 @@
-from django.test import TestCase
+import threading
+import time
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from cart.models import Cart, CartItem
+from products.models import Category, Product
+from .checkout import IDEMPOTENCY_WINDOW, OutOfStock, place_order
+from .models import IdempotencyKey, Order
+
+
+def make_buyer(username, product, quantity=1):
+    user = get_user_model().objects.create_user(username=username, password='x')
+    cart = Cart.objects.create(user=user)
+    CartItem.objects.create(cart=cart, product=product, quantity=quantity)
+    cart.refresh_totals()
+    return user
+
+
+class ConcurrentCheckoutTests(TransactionTestCase):
+    """Checkout paralel memakai transaksi sungguhan, jadi bukan TestCase"""
+
+    def test_concurrent_checkouts_never_oversell(self):
+        category = Category.objects.create(name='Uji', slug='uji')
+        product = Product.objects.create(category=category, name='Rebutan', slug='rebutan', price=1000, stock=5)
+        buyers = [make_buyer(f'pembeli-{index}', product) for index in range(12)]
+        outcomes = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(len(buyers))
+
+        def checkout(user):
+            barrier.wait()
+            outcome = 'db_error'
+            try:
+                # SQLite menolak tulis paralel ("database table is locked"):
+                # ulangi seperti klien yang mencoba lagi (dengan kunci
+                # idempotensi yang sama, karena error bisa muncul setelah commit)
+                for attempt in range(200):
+                    try:
+                        place_order(user, 'Alamat uji', 'bank_transfer', idempotency_key=f'uji-{user.pk}')
+                        outcome = 'ok'
+                    except OutOfStock:
+                        outcome = 'out_of_stock'
+                    except DatabaseError:
+                        time.sleep(0.01)
+                        continue
+                    break
+            finally:
+                connection.close()
+            with lock:
+                outcomes.append(outcome)
+
+        threads = [threading.Thread(target=checkout, args=(user,)) for user in buyers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        product.refresh_from_db()
+        self.assertEqual(outcomes.count('ok'), 5)
+        self.assertEqual(outcomes.count('out_of_stock'), 7)
+        self.assertEqual(product.stock, 0)
+        self.assertEqual(Order.objects.filter(items__product=product).count(), 5)
+
+
+class IdempotencyKeyTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Uji', slug='uji')
+        self.product = Product.objects.create(category=category, name='Barang', slug='barang', price=1000, stock=10)
+        self.user = make_buyer('pembeli', self.product, quantity=2)
+
+    def refill_cart(self):
+        CartItem.objects.create(cart=self.user.cart, product=self.product, quantity=2)
+
+    def test_replay_returns_first_order(self):
+        first = place_order(self.user, 'Alamat uji', 'bank_transfer', idempotency_key='kunci-1')
+        self.refill_cart()
+        second = place_order(self.user, 'Alamat uji', 'bank_transfer', idempotency_key='kunci-1')
+        self.assertEqual(second.pk, first.pk)
+        self.assertEqual(Order.objects.filter(user=self.user).count(), 1)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 8)
+        # Kiriman ulang tidak menyentuh keranjang
+        self.assertEqual(self.user.cart.items.count(), 1)
+
+    def test_key_reused_with_different_payload_returns_first_order(self):
+        first = place_order(self.user, 'Alamat uji', 'bank_transfer', idempotency_key='kunci-1')
+        self.refill_cart()
+        second = place_order(self.user, 'Alamat lain', 'cod', idempotency_key='kunci-1')
+        self.assertEqual(second.pk, first.pk)
+        self.assertEqual(second.shipping_address, 'Alamat uji')
+        self.assertEqual(second.payment_method, 'bank_transfer')
+        self.assertEqual(Order.objects.filter(user=self.user).count(), 1)
+
+    def test_expired_key_is_replaced(self):
+        first = place_order(self.user, 'Alamat uji', 'bank_transfer', idempotency_key='kunci-1')
+        # Kedaluwarsa tapi belum dipangkas prune_idempotency_keys
+        IdempotencyKey.objects.filter(user=self.user, key='kunci-1').update(
+            created_at=timezone.now() - IDEMPOTENCY_WINDOW - timedelta(minutes=1),
+        )
+        self.refill_cart()
+        second = place_order(self.user, 'Alamat uji', 'bank_transfer', idempotency_key='kunci-1')
+        self.assertNotEqual(second.pk, first.pk)
+        key = IdempotencyKey.objects.get(user=self.user, key='kunci-1')
+        self.assertEqual(key.order_id, second.pk)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 6)
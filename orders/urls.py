@@ -6,6 +6,7 @@ urlpatterns = [
     path('', views.OrderListView.as_view(), name='order_list'),
     path('admin/', views.AdminOrderListView.as_view(), name='admin_orders'),
     path('checkout/', views.checkout, name='checkout'),
+    path('events/', views.order_event_feed, name='order_event_feed'),
     path('<int:order_id>/', views.OrderDetailView.as_view(), name='order_detail'),
     path('<int:order_id>/update-status/', 
          views.update_order_status, 
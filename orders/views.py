@@ -1,14 +1,32 @@
+import uuid
+
+from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.views.generic import ListView, DetailView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from .models import Order, OrderItem
+from django.template.defaultfilters import filesizeformat
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from .checkout import CheckoutError, hold_cart, place_order, replayed_order
+from .events import event_feed, set_order_status
+from .receipts import InvalidReceipt, ReceiptUploadHandler, ingest_receipt, max_upload_size
+from .reservations import reservation_expiry
+from .models import Order
 from cart.models import Cart
-from django.db import transaction
+from core.pagination import CursorPaginationMixin
 
 @login_required
 def checkout(request):
+    # Form yang dikirim ulang (koneksi putus, klik ganda) langsung diarahkan
+    # ke pesanan pertama tanpa menyentuh stok atau keranjang
+    idempotency_key = ''
+    if request.method == 'POST':
+        idempotency_key = (request.POST.get('idempotency_key') or request.headers.get('Idempotency-Key', ''))[:64]
+        order = replayed_order(request.user, idempotency_key)
+        if order is not None:
+            return redirect('order_detail', order_id=order.id)
+    
     try:
         cart = Cart.objects.get(user=request.user)
     except Cart.DoesNotExist:
@@ -29,16 +47,7 @@ def checkout(request):
         notes = request.POST.get('notes')
         payment_method = request.POST.get('payment_method', 'bank_transfer')
         
-        # 2. Validasi stok sebelum memproses transaksi
-        for item in cart.items.all():
-            if item.product.stock < item.quantity:
-                messages.error(request, 
-                    f'Stok {item.product.name} tidak mencukupi. '
-                    f'Stok tersedia: {item.product.stock}, '
-                    f'Jumlah diminta: {item.quantity}')
-                return redirect('cart_detail')
-        
-        # 3. Format alamat lengkap untuk disimpan di database
+        # 2. Format alamat lengkap untuk disimpan di database
         complete_address = f"""
         {full_name}
         {phone}
@@ -50,46 +59,35 @@ def checkout(request):
         Metode Pembayaran: {payment_method}
         """
         
-        # 4. Hitung rincian biaya tambahan
-        shipping_fee = 15000
-        service_fee = 2000
-        cod_fee = 5000 if payment_method == 'cod' else 0
-        total_price = cart.total_price + shipping_fee + service_fee + cod_fee
-        
-        # 5. Eksekusi penyimpanan dengan Atomic Transaction (Aman)
-        with transaction.atomic():
-            order = Order.objects.create(
-                user=request.user,
-                shipping_address=complete_address,
-                total_price=total_price,
-                payment_method=payment_method
-            )
-            
-            # Buat item pesanan dan potong stok produk
-            for cart_item in cart.items.all():
-                OrderItem.objects.create(
-                    order=order,
-                    product=cart_item.product,
-                    quantity=cart_item.quantity,
-                    price=cart_item.product.price
-                )
-                
-                # Update product stock
-                cart_item.product.stock -= cart_item.quantity
-                cart_item.product.save()
-            
-            # Kosongkan keranjang setelah berhasil checkout
-            cart.items.all().delete()
+        # 3. Potong stok, buat pesanan, dan kosongkan keranjang dalam satu transaksi
+        try:
+            order = place_order(request.user, complete_address, payment_method, idempotency_key)
+        except CheckoutError as exc:
+            # Keranjang bisa sudah kosong karena kiriman paralel dengan kunci yang sama
+            order = replayed_order(request.user, idempotency_key)
+            if order is not None:
+                return redirect('order_detail', order_id=order.id)
+            messages.error(request, str(exc))
+            return redirect('cart_detail')
         
         messages.success(request, f"Pesanan #{order.order_number} berhasil dibuat!")
         return redirect('order_detail', order_id=order.id)
     
-    # Untuk GET request, tampilkan form
-    return render(request, 'orders/checkout.html', {'cart': cart})
+    # Untuk GET request: tahan stok selama pembeli mengisi form
+    try:
+        hold_cart(request.user)
+    except CheckoutError as exc:
+        messages.error(request, str(exc))
+        return redirect('cart_detail')
+    return render(request, 'orders/checkout.html', {
+        'cart': cart,
+        'reservation_expires_at': reservation_expiry(request.user),
+        'idempotency_key': uuid.uuid4().hex,
+    })
 
 # --- Class Based Views di bawah ini tetap sama ---
 
-class OrderListView(LoginRequiredMixin, ListView):
+class OrderListView(LoginRequiredMixin, CursorPaginationMixin, ListView):
     model = Order
     template_name = 'orders/order_list.html'
     context_object_name = 'orders'
@@ -119,18 +117,52 @@ def update_order_status(request, order_id):
     if request.method == 'POST':
         new_status = request.POST.get('status')
         if new_status in dict(Order.STATUS_CHOICES):
+            set_order_status([order.pk], new_status, actor=request.user)
             order.status = new_status
-            order.save()
             messages.success(request, f"Status pesanan #{order.order_number} diperbarui menjadi {order.get_status_display()}")
     # Mengarahkan kembali ke dashboard admin jika aksi dilakukan dari sana
     return redirect(request.META.get('HTTP_REFERER', 'dashboard_admin'))
     
 
-class AdminOrderListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+@login_required
+def order_event_feed(request):
+    """
+    Feed JSON riwayat status pesanan untuk analitik. Ulangi dengan
+    ``?cursor=<next_cursor>`` untuk mengambil event baru secara inkremental.
+    """
+    if not request.user.is_admin():
+        return JsonResponse({'error': 'Tidak diizinkan'}, status=403)
+    
+    status = request.GET.get('status', '')
+    if status and status not in dict(Order.STATUS_CHOICES):
+        return JsonResponse({'error': 'Status tidak dikenal'}, status=400)
+    try:
+        limit = int(request.GET.get('limit', 100))
+    except ValueError:
+        limit = 100
+    events, next_cursor = event_feed(request.GET.get('cursor'), status=status, limit=limit)
+    return JsonResponse({
+        'events': [
+            {
+                'id': event.id,
+                'order_id': event.order_id,
+                'from_status': event.from_status,
+                'status': event.status,
+                'actor_id': event.actor_id,
+                'created_at': event.created_at.isoformat(),
+            }
+            for event in events
+        ],
+        'next_cursor': next_cursor,
+    })
+    
+
+class AdminOrderListView(LoginRequiredMixin, UserPassesTestMixin, CursorPaginationMixin, ListView):
     model = Order
     template_name = 'orders/admin_order_list.html'
     context_object_name = 'orders'
     paginate_by = 20
+    approximate_total = True
     
     def test_func(self):
         return self.request.user.is_admin()
@@ -138,27 +170,55 @@ class AdminOrderListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     def get_queryset(self):
         status = self.request.GET.get('status', '')
         if status:
-            return Order.objects.filter(status=status).order_by('-created_at')
-        return Order.objects.all().order_by('-created_at')
+            return Order.objects.filter(status=status).select_related('user').order_by('-created_at')
+        return Order.objects.select_related('user').order_by('-created_at')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['status_choices'] = Order.STATUS_CHOICES
+        context['current_status'] = self.request.GET.get('status', '')
+        return context
     
 # Tambahkan fungsi ini di orders/views.py
 
+@csrf_exempt
 @login_required
 def upload_payment_receipt(request, order_id):
     if request.method == 'POST':
-        # Pastikan pesanan milik user yang sedang login atau user adalah admin
-        if request.user.is_admin():
-            order = get_object_or_404(Order, id=order_id)
-        else:
-            order = get_object_or_404(Order, id=order_id, user=request.user)
-            
-        receipt = request.FILES.get('receipt')
+        # Handler harus dipasang sebelum body dibaca (termasuk oleh CSRF),
+        # karena itu CSRF dicek manual setelah upload selesai diproses
+        handler = ReceiptUploadHandler(request)
+        request.upload_handlers = [handler]
+        request.FILES
+        if handler.too_large:
+            messages.error(request, f'Ukuran file bukti pembayaran maksimal {filesizeformat(max_upload_size())}.')
+            return redirect('order_detail', order_id=order_id)
+        return _save_payment_receipt(request, order_id)
+    
+    return redirect('order_detail', order_id=order_id)
+
+
+@csrf_protect
+def _save_payment_receipt(request, order_id):
+    # Pastikan pesanan milik user yang sedang login atau user adalah admin
+    if request.user.is_admin():
+        order = get_object_or_404(Order, id=order_id)
+    else:
+        order = get_object_or_404(Order, id=order_id, user=request.user)
         
-        if receipt:
-            order.payment_receipt = receipt # Pastikan field ini ada di model Order
-            order.save()
-            messages.success(request, 'Bukti pembayaran berhasil diunggah. Mohon tunggu verifikasi admin.')
+    receipt = request.FILES.get('receipt')
+    
+    if receipt:
+        try:
+            stored = ingest_receipt(order, receipt)
+        except InvalidReceipt as e:
+            messages.error(request, str(e))
         else:
-            messages.error(request, 'Gagal mengunggah. Silakan pilih file gambar terlebih dahulu.')
-            
+            if stored:
+                messages.success(request, 'Bukti pembayaran berhasil diunggah. Mohon tunggu verifikasi admin.')
+            else:
+                messages.info(request, 'Bukti pembayaran yang sama sudah pernah diunggah.')
+    else:
+        messages.error(request, 'Gagal mengunggah. Silakan pilih file gambar terlebih dahulu.')
+        
     return redirect('order_detail', order_id=order_id)
\ No newline at end of file
@@ -1,5 +1,9 @@
-from django.contrib import admin
-from .models import Category, Product
+from django.contrib import admin, messages
+
+from core.jobs import enqueue
+from .images import regenerate_derivatives
+from .models import Category, FeaturedProduct, Product
+from .related import rebuild_related_products
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -15,6 +19,27 @@ class ProductAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('name',)}
     search_fields = ['name', 'description']
     readonly_fields = ['created_at', 'updated_at']
+    actions = ['pin_unggulan', 'render_ulang_gambar', 'bangun_ulang_produk_terkait']
+
+    @admin.action(description='Pin sebagai produk unggulan di beranda')
+    def pin_unggulan(self, request, queryset):
+        pinned = 0
+        for product in queryset:
+            FeaturedProduct.objects.update_or_create(product=product, defaults={'pinned': True})
+            pinned += 1
+        self.message_user(request, f'{pinned} produk di-pin ke beranda.', messages.SUCCESS)
+
+    @admin.action(description='Render ulang turunan gambar (di background)')
+    def render_ulang_gambar(self, request, queryset):
+        product_ids = list(queryset.exclude(image='').values_list('id', flat=True))
+        for product_id in product_ids:
+            enqueue(regenerate_derivatives, product_id)
+        self.message_user(request, f'{len(product_ids)} produk dijadwalkan untuk render ulang gambar.', messages.SUCCESS)
+
+    @admin.action(description='Bangun ulang indeks produk terkait (di background)')
+    def bangun_ulang_produk_terkait(self, request, queryset):
+        enqueue(rebuild_related_products)
+        self.message_user(request, 'Pembangunan ulang indeks produk terkait dijadwalkan.', messages.SUCCESS)
 
     def get_form(self, request, obj=None, **kwargs):
         form = super().get_form(request, obj, **kwargs)
@@ -38,4 +63,12 @@ class ProductAdmin(admin.ModelAdmin):
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
         })
-    )
\ No newline at end of file
+    )
+
+@admin.register(FeaturedProduct)
+class FeaturedProductAdmin(admin.ModelAdmin):
+    list_display = ['product', 'pinned', 'position', 'created_at']
+    list_filter = ['pinned']
+    list_editable = ['pinned']
+    autocomplete_fields = ['product']
+    search_fields = ['product__name']
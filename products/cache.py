@@ -0,0 +1,163 @@
+"""
+Cache katalog berversi.
+
+Semua key katalog membawa nomor versi; signal ``post_save``/``post_delete`` pada
+``Product`` dan ``Category`` menaikkan versi sehingga seluruh key lama otomatis
+tidak terpakai lagi (tanpa harus menghapus satu per satu).
+
+Saat versi naik di bawah beban, hanya satu worker yang menghitung ulang sebuah
+key (single-flight lewat ``cache.add``); worker lain memakai salinan lama atau
+menunggu sebentar, sehingga database tidak diserbu bersamaan.
+
+Perubahan stok dari checkout (UPDATE tanpa signal) tidak menaikkan versi
+katalog. Fragmen yang bergantung pada stok (daftar dengan filter stok, facet,
+dashboard admin) memakai ``stock=True`` sehingga key-nya juga membawa versi
+stok, dan detail produk yang terjual dihapus per key lewat
+``forget_stock_changes``.
+
+Catatan: LocMemCache bersifat per-proses. Di produksi gunakan Redis
+(``REDIS_URL``) agar versi dan lock berlaku untuk semua worker.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Category, Product
+
+VERSION_KEY = 'catalog:version'
+STOCK_VERSION_KEY = 'catalog:stock-version'
+LOCK_TIMEOUT = 10
+STALE_TIMEOUT = 60 * 60 * 24
+WAIT_TIMEOUT = 2.0
+WAIT_INTERVAL = 0.05
+
+_MISSING = object()
+
+
+def catalog_timeout():
+    return getattr(settings, 'CATALOG_CACHE_TIMEOUT', 60 * 15)
+
+
+def _version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time()), None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Key belum ada (cache baru dinyalakan / di-flush)
+        version = int(time.time())
+        cache.set(key, version, None)
+        return version
+
+
+def catalog_version():
+    return _version(VERSION_KEY)
+
+
+def bump_catalog_version():
+    return _bump(VERSION_KEY)
+
+
+def stock_version():
+    return _version(STOCK_VERSION_KEY)
+
+
+def bump_stock_version():
+    return _bump(STOCK_VERSION_KEY)
+
+
+def make_key(*parts):
+    raw = ':'.join(str(part) for part in parts)
+    if len(raw) > 120:
+        raw = hashlib.md5(raw.encode()).hexdigest()
+    return raw
+
+
+def catalog_key(key, stock=False):
+    if stock:
+        return f'catalog:{catalog_version()}:{stock_version()}:{key}'
+    return f'catalog:{catalog_version()}:{key}'
+
+
+def get_or_build(key, builder, timeout=None, stock=False):
+    """
+    Ambil nilai ``key`` dari cache katalog, hitung dengan ``builder`` jika belum
+    ada. ``stock=True`` untuk nilai yang ikut berubah saat stok terjual.
+    """
+    timeout = catalog_timeout() if timeout is None else timeout
+    versioned_key = catalog_key(key, stock)
+    stale_key = f'catalog:stale:{key}'
+
+    value = cache.get(versioned_key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    lock_key = f'{versioned_key}:lock'
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            value = builder()
+            cache.set(versioned_key, value, timeout)
+            cache.set(stale_key, value, STALE_TIMEOUT)
+        finally:
+            cache.delete(lock_key)
+        return value
+
+    # Worker lain sedang menghitung ulang: pakai salinan lama bila ada
+    value = cache.get(stale_key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        value = cache.get(versioned_key, _MISSING)
+        if value is not _MISSING:
+            return value
+    return builder()
+
+
+def get_categories():
+    return get_or_build('categories', lambda: list(Category.objects.all()))
+
+
+def get_category(slug):
+    """Kategori berdasarkan slug, ``None`` jika tidak ada."""
+    return get_or_build(
+        make_key('category', slug),
+        lambda: Category.objects.filter(slug=slug).first(),
+    )
+
+
+def get_new_arrivals(limit=4):
+    return get_or_build(
+        make_key('new_arrivals', limit),
+        lambda: list(Product.objects.filter(is_active=True).order_by('-created_at')[:limit]),
+    )
+
+
+def get_product(slug):
+    return get_or_build(
+        make_key('product', slug),
+        lambda: Product.objects.select_related('category').filter(slug=slug).first(),
+    )
+
+
+def forget_stock_changes(slugs):
+    """
+    Setelah stok ``slugs`` berubah tanpa signal: hapus cache detail produk
+    tersebut (termasuk salinan lama) dan naikkan versi stok.
+    """
+    keys = []
+    for slug in slugs:
+        key = make_key('product', slug)
+        keys += [catalog_key(key), f'catalog:stale:{key}']
+    cache.delete_many(keys)
+    bump_stock_version()
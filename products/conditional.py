@@ -0,0 +1,94 @@
+"""
+Conditional GET (ETag / Last-Modified) untuk halaman katalog.
+
+Validator dihitung dari ``Product.updated_at`` dengan satu query index,
+sehingga request dengan ``If-None-Match`` yang cocok langsung mendapat 304
+tanpa render template. Pengguna login melihat isi keranjang di ``base.html``,
+jadi ETag mereka juga memuat id user dan sidik jari keranjang; untuk tamu
+ETag memuat cookie keranjang. Halaman juga menyisipkan token CSRF, sehingga
+secret CSRF (berganti saat login/logout) ikut dalam ETag; tanpa itu browser
+menyimpan token lama lewat 304 dan POST berikutnya ditolak 403.
+"""
+import hashlib
+
+from django.contrib.messages import get_messages
+from django.db.models import Count, F, Max, Sum
+from django.middleware.csrf import get_token
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from cart.anonymous import COOKIE_NAME as CART_COOKIE
+from cart.models import CartItem
+from .cache import catalog_version
+from .models import Product
+
+
+def cart_fingerprint(user):
+    """Ringkasan isi keranjang dalam satu query agregat."""
+    state = CartItem.objects.filter(cart__user=user).aggregate(
+        lines=Count('id'),
+        units=Sum('quantity'),
+        mix=Sum(F('quantity') * F('product_id')),
+    )
+    return f"{state['lines']}.{state['units'] or 0}.{state['mix'] or 0}"
+
+
+class ConditionalGetMixin:
+    """
+    Mixin untuk view katalog. Subclass mengisi ``get_catalog_state`` yang
+    mengembalikan ``(updated_at, token)`` atau ``None`` bila objek tidak ada.
+    """
+
+    def get_catalog_state(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+    def _validators(self, request, *args, **kwargs):
+        if not hasattr(self, '_validator_cache'):
+            self._validator_cache = None
+            # Pesan flash ditampilkan di base.html, jangan sampai tertelan 304
+            if request.method in ('GET', 'HEAD') and not len(get_messages(request)):
+                state = self.get_catalog_state(request, *args, **kwargs)
+                if state is not None:
+                    updated_at, token = state
+                    # get_token: request tanpa cookie CSRF mendapat secret baru, jadi tidak 304
+                    get_token(request)
+                    parts = [catalog_version(), token, request.get_full_path(), request.META['CSRF_COOKIE']]
+                    if request.user.is_authenticated:
+                        parts += [request.user.pk, cart_fingerprint(request.user)]
+                    else:
+                        # Keranjang tamu ada di cookie bertanda tangan
+                        parts.append(request.COOKIES.get(CART_COOKIE, ''))
+                    digest = hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+                    self._validator_cache = (f'W/"{digest}"', updated_at)
+        return self._validator_cache
+
+    def _etag(self, request, *args, **kwargs):
+        validators = self._validators(request, *args, **kwargs)
+        return validators[0] if validators else None
+
+    def _last_modified(self, request, *args, **kwargs):
+        validators = self._validators(request, *args, **kwargs)
+        # Last-Modified tidak tahu isi keranjang, hanya untuk tamu tanpa keranjang
+        if validators and not request.user.is_authenticated and CART_COOKIE not in request.COOKIES:
+            return validators[1]
+        return None
+
+    def dispatch(self, request, *args, **kwargs):
+        view = condition(etag_func=self._etag, last_modified_func=self._last_modified)(super().dispatch)
+        # no-cache: browser selalu revalidasi, tapi cukup dengan 304
+        return cache_control(private=True, no_cache=True)(view)(request, *args, **kwargs)
+
+
+def product_state(slug):
+    updated_at = Product.objects.filter(slug=slug).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        return None
+    return updated_at, updated_at.timestamp()
+
+
+def product_list_state(category_slug=None):
+    queryset = Product.objects.filter(is_active=True)
+    if category_slug:
+        queryset = queryset.filter(category__slug=category_slug)
+    state = queryset.aggregate(updated_at=Max('updated_at'), count=Count('id'))
+    return state['updated_at'], f"{state['count']}.{state['updated_at'] and state['updated_at'].timestamp()}"
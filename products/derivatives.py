@@ -0,0 +1,65 @@
+"""
+Pembuatan turunan gambar produk (JPEG/WebP berbagai lebar + placeholder kecil).
+
+Modul ini sengaja tidak mengimpor Django sama sekali supaya aman dijalankan
+di process pool (start method ``spawn``) tanpa ``django.setup()``.
+"""
+import base64
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+WIDTHS = (120, 320, 640)
+PLACEHOLDER_WIDTH = 16
+
+FORMATS = {
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+}
+
+
+def _flatten(image):
+    """Buang alpha channel (JPEG tidak mendukung transparansi)."""
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def _encode(image, fmt):
+    pil_format, options = FORMATS[fmt]
+    buffer = BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def render_derivatives(data, widths=WIDTHS):
+    """
+    Buat semua turunan dari bytes gambar asli.
+
+    Mengembalikan ``{'jpeg': [(lebar, bytes), ...], 'webp': [...], 'placeholder': data_uri}``.
+    Gambar tidak pernah diperbesar; lebar yang sama hanya dibuat sekali.
+    """
+    with Image.open(BytesIO(data)) as original:
+        image = _flatten(original)
+
+    result = {fmt: [] for fmt in FORMATS}
+    seen = set()
+    for width in sorted(widths):
+        variant = image.copy()
+        variant.thumbnail((width, width * 4), Image.LANCZOS)
+        if variant.width in seen:
+            continue
+        seen.add(variant.width)
+        for fmt in FORMATS:
+            result[fmt].append((variant.width, _encode(variant, fmt)))
+
+    tiny = image.copy()
+    tiny.thumbnail((PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH * 4), Image.LANCZOS)
+    buffer = BytesIO()
+    tiny.save(buffer, 'JPEG', quality=40)
+    result['placeholder'] = 'data:image/jpeg;base64,' + base64.b64encode(buffer.getvalue()).decode()
+    return result
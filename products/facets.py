@@ -0,0 +1,127 @@
+"""
+Filter faset daftar produk: rentang harga, stok tersedia, dan kategori.
+
+Semua jumlah faset dihitung dengan satu query agregat yang dikelompokkan per
+kategori (``COUNT(...) FILTER (WHERE ...)``). Setiap faset menerapkan filter
+lain tapi tidak filternya sendiri, sehingga angka di samping opsi adalah
+jumlah produk jika opsi itu dipilih.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Count, Q
+
+from .models import Product
+
+# (key, label, harga minimum, harga maksimum) - batas inklusif, harga tanpa desimal
+PRICE_BUCKETS = [
+    ('under-1m', 'Di bawah Rp 1 juta', None, 999999),
+    ('1m-5m', 'Rp 1 - 5 juta', 1000000, 4999999),
+    ('5m-10m', 'Rp 5 - 10 juta', 5000000, 9999999),
+    ('10m-20m', 'Rp 10 - 20 juta', 10000000, 19999999),
+    ('over-20m', 'Di atas Rp 20 juta', 20000000, None),
+]
+
+
+# Batas nilai Product.price (max_digits=12, decimal_places=0)
+_price_field = Product._meta.get_field('price')
+PRICE_LIMIT = Decimal(10) ** (_price_field.max_digits - _price_field.decimal_places)
+
+
+def _decimal(value):
+    """Harga dari query string; ``None`` jika tidak valid (nan, inf, di luar rentang kolom)"""
+    try:
+        value = Decimal(value) if value not in (None, '') else None
+    except InvalidOperation:
+        return None
+    if value is None or not value.is_finite() or abs(value) >= PRICE_LIMIT:
+        return None
+    return value
+
+
+def parse_filters(params):
+    return {
+        'min_price': _decimal(params.get('min_price')),
+        'max_price': _decimal(params.get('max_price')),
+        'in_stock': params.get('in_stock') == '1',
+    }
+
+
+def filters_key(filters):
+    """Bentuk kanonik filter untuk key cache; parameter GET lain tidak ikut"""
+    return f"{filters['min_price']}:{filters['max_price']}:{int(filters['in_stock'])}"
+
+
+def price_q(min_price=None, max_price=None):
+    q = Q()
+    if min_price is not None:
+        q &= Q(price__gte=min_price)
+    if max_price is not None:
+        q &= Q(price__lte=max_price)
+    return q
+
+
+def stock_q(in_stock):
+    return Q(stock__gt=0) if in_stock else Q()
+
+
+def apply_filters(queryset, filters):
+    return queryset.filter(price_q(filters['min_price'], filters['max_price']), stock_q(filters['in_stock']))
+
+
+def facet_counts(filters, category=None):
+    """
+    Hitung faset dalam satu query ``GROUP BY category_id``.
+
+    Mengembalikan ``{'categories': {category_id: n}, 'in_stock': n, 'prices': {key: n}}``.
+    """
+    selected_price = price_q(filters['min_price'], filters['max_price'])
+    selected_stock = stock_q(filters['in_stock'])
+
+    annotations = {
+        # Faset kategori: filter harga + stok
+        'category_count': Count('id', filter=selected_price & selected_stock),
+        # Faset stok: filter harga saja
+        'in_stock_count': Count('id', filter=selected_price & Q(stock__gt=0)),
+    }
+    for key, label, low, high in PRICE_BUCKETS:
+        # Faset harga: filter stok saja
+        annotations[f'price_{key}'] = Count('id', filter=price_q(low, high) & selected_stock)
+
+    rows = (
+        Product.objects.filter(is_active=True)
+        .values('category_id')
+        .annotate(**annotations)
+        .order_by()
+    )
+
+    counts = {'categories': {}, 'in_stock': 0, 'prices': {key: 0 for key, *_ in PRICE_BUCKETS}}
+    for row in rows:
+        counts['categories'][row['category_id']] = row['category_count']
+        # Faset selain kategori hanya menghitung kategori yang sedang dipilih
+        if category is not None and row['category_id'] != category.id:
+            continue
+        counts['in_stock'] += row['in_stock_count']
+        for key, *_ in PRICE_BUCKETS:
+            counts['prices'][key] += row[f'price_{key}']
+    return counts
+
+
+def price_options(filters, counts, params):
+    """Opsi harga siap tampil: label, jumlah, query string, dan status aktif."""
+    options = []
+    for key, label, low, high in PRICE_BUCKETS:
+        active = filters['min_price'] == _decimal(low) and filters['max_price'] == _decimal(high)
+        query = params.copy()
+        query.pop('cursor', None)
+        for name, value in (('min_price', low), ('max_price', high)):
+            query.pop(name, None)
+            # Klik opsi yang sedang aktif = hapus filter harga
+            if value is not None and not active:
+                query[name] = value
+        options.append({
+            'label': label,
+            'count': counts['prices'][key],
+            'query': query.urlencode(),
+            'active': active,
+        })
+    return options
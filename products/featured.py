@@ -0,0 +1,88 @@
+"""
+Rotasi produk unggulan beranda.
+
+Menggantikan ``order_by('?')`` yang mengurutkan seluruh katalog setiap request.
+Pool acak disimpan di tabel ``FeaturedProduct``; setiap request cukup membaca
+satu jendela posisi acak dari pool tersebut lewat index ``(pinned, position)``.
+
+Posisi awal jendela diambil dari jumlah posisi yang benar-benar ada di pool
+(di-cache sampai pool berubah), bukan dari ``FEATURED_POOL_SIZE``, agar
+rotasi tetap merata walaupun pool lebih kecil dari setelan.
+
+Request tidak pernah menulis pool. Pool diisi migrasi 0011 dan diacak ulang
+oleh ``manage.py reshuffle_featured`` (cron); selama pool masih kosong beranda
+menampilkan produk terbaru yang masih ada stoknya.
+"""
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max, Q
+
+from .models import FeaturedProduct, Product
+
+POSITIONS_KEY = 'featured:positions'
+
+
+def pool_size():
+    return getattr(settings, 'FEATURED_POOL_SIZE', 48)
+
+
+def rotating_positions():
+    """Banyaknya posisi pool non-pin (posisi terbesar + 1)"""
+    positions = cache.get(POSITIONS_KEY)
+    if positions is None:
+        last = FeaturedProduct.objects.filter(pinned=False).aggregate(last=Max('position'))['last']
+        positions = 0 if last is None else last + 1
+        cache.set(POSITIONS_KEY, positions, None)
+    return positions
+
+
+def forget_positions():
+    cache.delete(POSITIONS_KEY)
+
+
+@transaction.atomic
+def reshuffle_featured_pool(size=None):
+    """Isi ulang pool dengan sampel acak produk aktif yang masih ada stoknya."""
+    size = size or pool_size()
+    FeaturedProduct.objects.filter(pinned=False).delete()
+    pinned_ids = FeaturedProduct.objects.values_list('product_id', flat=True)
+    candidates = list(
+        Product.objects.filter(is_active=True, stock__gt=0)
+        .exclude(id__in=pinned_ids)
+        .values_list('id', flat=True)
+    )
+    chosen = random.sample(candidates, min(size, len(candidates)))
+    FeaturedProduct.objects.bulk_create([
+        FeaturedProduct(product_id=product_id, position=position)
+        for position, product_id in enumerate(chosen)
+    ])
+    transaction.on_commit(forget_positions)
+    return len(chosen)
+
+
+def get_featured_products(limit=8):
+    """Produk pin lebih dulu, sisanya jendela acak dari pool (hanya baca)."""
+    pool = FeaturedProduct.objects.filter(product__is_active=True).select_related('product')
+    positions = rotating_positions()
+    start = random.randrange(positions) if positions else 0
+
+    rows = list(
+        pool.filter(Q(pinned=True) | Q(position__gte=start))
+        .order_by('-pinned', 'position')[:limit]
+    )
+    if len(rows) < limit:
+        # Jendela melewati ujung pool, lanjutkan dari posisi 0
+        rows += pool.filter(pinned=False, position__lt=start).order_by('position')[:limit - len(rows)]
+
+    if not rows and not FeaturedProduct.objects.exists():
+        # Pool belum diisi (katalog kosong saat migrasi): cukup baca, jangan
+        # mengisi pool dari request GET
+        return list(Product.objects.filter(is_active=True, stock__gt=0).order_by('-created_at')[:limit])
+
+    pinned = [row.product for row in rows if row.pinned]
+    rotating = [row.product for row in rows if not row.pinned]
+    random.shuffle(rotating)
+    return pinned + rotating
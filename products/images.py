@@ -0,0 +1,117 @@
+"""
+Pipeline turunan gambar produk.
+
+Saat ``Product.image`` berubah, gambar dirender ulang di process pool
+(lihat ``products/derivatives.py``) atau, dengan
+``IMAGE_DERIVATIVES_ASYNC = 'queue'``, di antrian job ``run_worker``
+sehingga penyimpanan di admin tidak menunggu Pillow. Hasilnya disimpan ke storage dan dicatat di
+``Product.image_variants`` untuk dipakai template tag ``product_image``.
+"""
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+
+from core.jobs import enqueue
+from .cache import bump_catalog_version
+from .derivatives import FORMATS, render_derivatives
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_DIR = 'products/derivatives'
+EXTENSIONS = {'jpeg': 'jpg', 'webp': 'webp'}
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=getattr(settings, 'IMAGE_WORKERS', 2),
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _executor
+
+
+def needs_derivatives(product):
+    return bool(product.image) and product.image_variants.get('source') != product.image.name
+
+
+def derivative_name(source_name, width, fmt):
+    stem = PurePosixPath(source_name).stem
+    return f'{DERIVATIVE_DIR}/{stem}-{width}.{EXTENSIONS[fmt]}'
+
+
+def store_derivatives(product_id, source_name, rendered):
+    """Simpan hasil render ke storage lalu catat di ``Product.image_variants``."""
+    variants = {'source': source_name, 'placeholder': rendered['placeholder']}
+    for fmt in FORMATS:
+        entries = {}
+        for width, data in rendered[fmt]:
+            name = derivative_name(source_name, width, fmt)
+            if default_storage.exists(name):
+                default_storage.delete(name)
+            entries[str(width)] = default_storage.save(name, ContentFile(data))
+        variants[fmt] = entries
+
+    # update() agar tidak memicu post_save lagi; filter image memastikan
+    # hasil render lama tidak menimpa gambar yang baru diunggah
+    updated = Product.objects.filter(pk=product_id, image=source_name).update(image_variants=variants)
+    if updated:
+        bump_catalog_version()
+    return variants
+
+
+def read_source(product):
+    with product.image.open('rb') as source:
+        return source.read()
+
+
+def generate_derivatives(product):
+    """Render dan simpan turunan secara sinkron (dipakai command backfill)."""
+    return store_derivatives(product.pk, product.image.name, render_derivatives(read_source(product)))
+
+
+def regenerate_derivatives(product_id):
+    """Job antrian: render ulang turunan gambar satu produk."""
+    product = Product.objects.filter(pk=product_id).first()
+    if product is None or not product.image:
+        return None
+    return generate_derivatives(product)
+
+
+def schedule_derivatives(product):
+    """Kirim pekerjaan render ke process pool tanpa menunggu hasilnya."""
+    product_id, source_name = product.pk, product.image.name
+    mode = getattr(settings, 'IMAGE_DERIVATIVES_ASYNC', True)
+    if mode == 'queue':
+        return enqueue(regenerate_derivatives, product_id)
+    try:
+        if not mode:
+            return generate_derivatives(product)
+        data = read_source(product)
+    except Exception:
+        # Gambar rusak/hilang tidak boleh menggagalkan penyimpanan produk
+        logger.exception('Gagal membuat turunan gambar untuk produk %s', product_id)
+        return None
+
+    future = get_executor().submit(render_derivatives, data)
+
+    def on_done(future):
+        try:
+            store_derivatives(product_id, source_name, future.result())
+        except Exception:
+            logger.exception('Gagal membuat turunan gambar untuk produk %s', product_id)
+        finally:
+            # Callback berjalan di thread milik executor, tutup koneksinya
+            connection.close()
+
+    future.add_done_callback(on_done)
+    return future
@@ -0,0 +1,56 @@
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from products.derivatives import render_derivatives
+from products.images import read_source, get_executor, needs_derivatives, store_derivatives
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Buat thumbnail, WebP, dan placeholder untuk gambar produk yang sudah ada'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Render ulang walaupun turunan sudah ada')
+
+    def handle(self, *args, **options):
+        products = (
+            product for product in Product.objects.exclude(image='').only('id', 'image', 'image_variants').iterator()
+            if options['force'] or needs_derivatives(product)
+        )
+        started = time.monotonic()
+        executor = get_executor()
+        # Batasi job yang sedang berjalan/antre agar gambar sumber tidak
+        # dimuat ke memori sekaligus untuk seluruh katalog
+        max_pending = 2 * getattr(settings, 'IMAGE_WORKERS', 2)
+        futures = {}
+        done = total = 0
+        for product in products:
+            total += 1
+            if len(futures) >= max_pending:
+                done += self.collect(futures, FIRST_COMPLETED)
+            try:
+                futures[executor.submit(render_derivatives, read_source(product))] = product
+            except OSError as exc:
+                self.stderr.write(f'{product.image.name}: {exc}')
+        while futures:
+            done += self.collect(futures)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{done}/{total} gambar diproses dalam {time.monotonic() - started:.1f} detik.'
+        ))
+
+    def collect(self, futures, return_when=ALL_COMPLETED):
+        """Simpan hasil future yang selesai dan keluarkan dari ``futures``"""
+        finished, _ = wait(futures, return_when=return_when)
+        done = 0
+        for future in finished:
+            product = futures.pop(future)
+            try:
+                store_derivatives(product.pk, product.image.name, future.result())
+                done += 1
+            except Exception as exc:
+                self.stderr.write(f'{product.image.name}: {exc}')
+        return done
@@ -0,0 +1,237 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from pathlib import Path
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.text import slugify
+
+from cart.models import Cart, refresh_cart_totals
+from products.cache import bump_catalog_version
+from products.facets import PRICE_LIMIT
+from products.models import Category, Product
+from products.search import get_backend
+
+PRODUCT_UPDATE_FIELDS = ['category', 'name', 'description', 'price', 'stock', 'image', 'is_active', 'updated_at']
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'ya', 'aktif'}
+PRICE_QUANTUM = Decimal(1).scaleb(-Product._meta.get_field('price').decimal_places)
+# Batas PositiveIntegerField di semua database yang didukung Django
+STOCK_LIMIT = 2147483647
+
+
+class InvalidLine:
+    """Baris JSONL yang tidak bisa dibaca; tetap dihitung agar checkpoint tidak bergeser."""
+
+    def __init__(self, line, error):
+        self.line = line.rstrip('\n')
+        self.error = error
+
+
+def read_rows(path, fmt):
+    """Baca file baris per baris (streaming), tidak memuat seluruh file ke memori."""
+    with open(path, newline='', encoding='utf-8') as handle:
+        if fmt == 'csv':
+            yield from csv.DictReader(handle)
+        else:
+            for line in handle:
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as exc:
+                    yield InvalidLine(line, exc)
+                    continue
+                yield row if isinstance(row, dict) else InvalidLine(line, 'bukan objek JSON')
+
+
+def text(row, field):
+    """Nilai kolom sebagai string; baris CSV yang terlalu pendek berisi ``None``"""
+    value = row.get(field)
+    return '' if value is None else str(value).strip()
+
+
+def parse_price(value):
+    try:
+        price = Decimal(value)
+        if price.is_finite():
+            price = price.quantize(PRICE_QUANTUM)
+    except InvalidOperation:
+        raise ValueError(f'harga {value!r} tidak valid') from None
+    if not price.is_finite() or not 0 <= price < PRICE_LIMIT:
+        raise ValueError(f'harga {value!r} di luar rentang')
+    return price
+
+
+def parse_stock(value):
+    stock = int(value or 0)
+    if not 0 <= stock <= STOCK_LIMIT:
+        raise ValueError(f'stok {value!r} di luar rentang')
+    return stock
+
+
+def parse_bool(value, default=True):
+    if value in (None, ''):
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+class Command(BaseCommand):
+    help = 'Impor katalog supplier (CSV/JSONL) secara streaming dengan upsert per batch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File CSV atau JSONL')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Default: dari ekstensi file')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--images', help='Folder lokal tempat file gambar pada kolom "image"')
+        parser.add_argument('--image-workers', type=int, default=8)
+        parser.add_argument('--checkpoint', help='File progres (default: <path>.checkpoint)')
+        parser.add_argument('--restart', action='store_true', help='Abaikan checkpoint, mulai dari baris pertama')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'File {path} tidak ditemukan')
+        fmt = options['format'] or ('csv' if path.suffix.lower() == '.csv' else 'jsonl')
+        self.images_dir = Path(options['images']) if options['images'] else None
+        self.category_ids = {}
+        checkpoint = Path(options['checkpoint'] or f'{path}.checkpoint')
+
+        done = 0
+        if checkpoint.exists() and not options['restart']:
+            done = json.loads(checkpoint.read_text())['rows']
+            self.stdout.write(f'Melanjutkan dari baris {done} (checkpoint {checkpoint})')
+
+        rows = islice(read_rows(path, fmt), done, None)
+        started = time.monotonic()
+        imported = skipped = 0
+        with ThreadPoolExecutor(max_workers=options['image_workers']) as executor:
+            self.executor = executor
+            while True:
+                batch = list(islice(rows, options['batch_size']))
+                if not batch:
+                    break
+                saved, invalid = self.import_batch(batch)
+                imported += saved
+                skipped += invalid
+                done += len(batch)
+                # Checkpoint ditulis setelah batch commit: aman dilanjutkan jika crash
+                checkpoint.write_text(json.dumps({'rows': done}))
+                elapsed = time.monotonic() - started
+                self.stdout.write(f'{done} baris, {imported} produk, {imported / elapsed:.0f} produk/detik')
+
+        bump_catalog_version()
+        checkpoint.unlink(missing_ok=True)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Selesai: {imported} produk diimpor, {skipped} baris dilewati, '
+            f'{elapsed:.1f} detik ({imported / max(elapsed, 0.001):.0f} produk/detik).'
+        ))
+        if imported:
+            self.stdout.write('Jalankan "manage.py generate_image_derivatives" untuk membuat thumbnail.')
+
+    def import_batch(self, batch):
+        products, images, invalid = {}, {}, 0
+        for row in batch:
+            if isinstance(row, InvalidLine):
+                invalid += 1
+                self.stderr.write(f'Baris dilewati ({row.error}): {row.line}')
+                continue
+            try:
+                product = self.build_product(row)
+            except (KeyError, ValueError, InvalidOperation) as exc:
+                invalid += 1
+                self.stderr.write(f'Baris dilewati ({exc}): {row}')
+                continue
+            # Slug ganda dalam satu batch: baris terakhir yang dipakai
+            products[product.slug] = product
+            images.pop(product.slug, None)
+            if row.get('image'):
+                images[product.slug] = row['image']
+
+        # Gambar disalin paralel (I/O) sebelum transaksi dibuka
+        stored = dict(zip(images, self.executor.map(self.store_image, images.values())))
+        for slug, name in stored.items():
+            if name:
+                products[slug].image = name
+
+        with transaction.atomic():
+            self.upsert_categories({
+                product._category_slug: product._category_name for product in products.values()
+            })
+            for product in products.values():
+                product.category_id = self.category_ids[product._category_slug]
+            with_image = [product for product in products.values() if product.image]
+            without_image = [product for product in products.values() if not product.image]
+            for group, update_fields in (
+                (with_image, PRODUCT_UPDATE_FIELDS),
+                # Baris tanpa gambar tidak boleh menghapus gambar produk yang sudah ada
+                (without_image, [field for field in PRODUCT_UPDATE_FIELDS if field != 'image']),
+            ):
+                if group:
+                    Product.objects.bulk_create(
+                        group,
+                        update_conflicts=True,
+                        unique_fields=['slug'],
+                        update_fields=update_fields,
+                    )
+            # bulk_create tidak memicu signal, perbarui indeks pencarian manual
+            product_ids = list(Product.objects.filter(slug__in=products).values_list('id', flat=True))
+            get_backend().index_products(product_ids)
+            # Harga bisa berubah: subtotal keranjang yang memuat produk ini ikut dihitung ulang
+            refresh_cart_totals(Cart.objects.filter(items__product_id__in=product_ids))
+        return len(products), invalid
+
+    def upsert_categories(self, category_rows):
+        missing = {slug: name for slug, name in category_rows.items() if slug not in self.category_ids}
+        if not missing:
+            return
+        Category.objects.bulk_create(
+            [Category(slug=slug, name=name) for slug, name in missing.items()],
+            update_conflicts=True,
+            unique_fields=['slug'],
+            update_fields=['name'],
+        )
+        self.category_ids.update(Category.objects.filter(slug__in=missing).values_list('slug', 'id'))
+
+    def build_product(self, row):
+        name = text(row, 'name')
+        category_name = text(row, 'category')
+        if not name or not category_name or not text(row, 'price'):
+            raise ValueError('name/category/price kosong')
+        product = Product(
+            name=name,
+            slug=(text(row, 'slug') or slugify(name))[:50],
+            description=text(row, 'description'),
+            price=parse_price(text(row, 'price')),
+            stock=parse_stock(text(row, 'stock')),
+            is_active=parse_bool(row.get('is_active')),
+        )
+        if not product.slug:
+            raise ValueError('slug kosong')
+        product._category_name = category_name
+        product._category_slug = (text(row, 'category_slug') or slugify(category_name))[:50]
+        return product
+
+    def store_image(self, filename):
+        """Salin gambar ke storage. File yang sudah ada dipakai ulang (aman untuk resume)."""
+        if self.images_dir is None:
+            return filename
+        source = self.images_dir / filename
+        target = f'products/{os.path.basename(filename)}'
+        try:
+            if default_storage.exists(target) and default_storage.size(target) == source.stat().st_size:
+                return target
+            with open(source, 'rb') as handle:
+                return default_storage.save(target, File(handle))
+        except OSError as exc:
+            self.stderr.write(f'Gambar {source} gagal disalin: {exc}')
+            return None
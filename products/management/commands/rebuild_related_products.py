@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from products.related import rebuild_related_products
+
+
+class Command(BaseCommand):
+    help = 'Bangun ulang indeks produk terkait (sering dibeli bersama) dari riwayat pesanan'
+
+    def handle(self, *args, **options):
+        created = rebuild_related_products()
+        self.stdout.write(self.style.SUCCESS(f'{created} pasangan produk terkait disimpan.'))
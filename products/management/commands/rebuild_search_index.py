@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from products.search import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Bangun ulang indeks pencarian produk dari awal'
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Indeks pencarian dibangun ulang ({backend.__class__.__name__}).'
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from products.featured import pool_size, reshuffle_featured_pool
+
+
+class Command(BaseCommand):
+    help = 'Acak ulang pool produk unggulan beranda (jalankan berkala lewat cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=pool_size(), help='Jumlah produk dalam pool')
+
+    def handle(self, *args, **options):
+        count = reshuffle_featured_pool(options['size'])
+        self.stdout.write(self.style.SUCCESS(f'{count} produk masuk pool unggulan.'))
@@ -0,0 +1,79 @@
+from django.db import DatabaseError, migrations, transaction
+
+
+POSTGRES_FORWARD = [
+    """
+    CREATE TABLE products_productsearch (
+        product_id bigint PRIMARY KEY
+            REFERENCES products_product (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+        document tsvector NOT NULL
+    )
+    """,
+    'CREATE INDEX products_productsearch_document_gin ON products_productsearch USING gin (document)',
+    """
+    INSERT INTO products_productsearch (product_id, document)
+    SELECT p.id,
+           setweight(to_tsvector('simple', p.name), 'A') ||
+           setweight(to_tsvector('simple', c.name), 'B') ||
+           setweight(to_tsvector('simple', p.description), 'C')
+    FROM products_product p JOIN products_category c ON c.id = p.category_id
+    WHERE p.is_active
+    """,
+]
+
+# Opsional: fallback fuzzy butuh pg_trgm, tidak semua hosting mengizinkan CREATE EXTENSION
+POSTGRES_TRIGRAM = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS products_product_name_trgm ON products_product USING gin (name gin_trgm_ops)',
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE products_productsearch USING fts5(
+        name, category, description,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    INSERT INTO products_productsearch (rowid, name, category, description)
+    SELECT p.id, p.name, c.name, p.description
+    FROM products_product p JOIN products_category c ON c.id = p.category_id
+    WHERE p.is_active
+    """,
+]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for sql in POSTGRES_FORWARD:
+            schema_editor.execute(sql)
+        try:
+            with transaction.atomic(using=schema_editor.connection.alias):
+                for sql in POSTGRES_TRIGRAM:
+                    schema_editor.execute(sql)
+        except DatabaseError:
+            pass
+    elif vendor == 'sqlite':
+        for sql in SQLITE_FORWARD:
+            schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS products_product_name_trgm')
+        schema_editor.execute('DROP TABLE IF EXISTS products_productsearch')
+    elif vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS products_productsearch')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_category_icon_class_alter_product_price'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_product_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', '-created_at', '-id'], name='product_active_created_idx'),
+        ),
+    ]
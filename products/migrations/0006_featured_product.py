@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_product_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeaturedProduct',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pinned', models.BooleanField(default=False, help_text='Produk yang di-pin selalu tampil di beranda')),
+                ('position', models.PositiveIntegerField(blank=True, editable=False, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='featured', to='products.product')),
+            ],
+            options={
+                'ordering': ['-pinned', 'position'],
+                'indexes': [models.Index(fields=['pinned', 'position'], name='featured_pinned_position_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_featured_product'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'updated_at'], name='product_active_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'category', 'updated_at'], name='product_cat_updated_idx'),
+        ),
+    ]
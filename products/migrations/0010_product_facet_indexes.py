@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_related_product'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'category', '-created_at'], name='product_active_cat_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'price'], name='product_active_price_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:40
+
+import random
+
+from django.conf import settings
+from django.db import migrations
+
+
+def seed_featured_pool(apps, schema_editor):
+    """Isi pool unggulan sekali saat deploy agar beranda tidak perlu menulis"""
+    FeaturedProduct = apps.get_model('products', 'FeaturedProduct')
+    Product = apps.get_model('products', 'Product')
+    if FeaturedProduct.objects.exists():
+        return
+    candidates = list(Product.objects.filter(is_active=True, stock__gt=0).values_list('id', flat=True))
+    size = getattr(settings, 'FEATURED_POOL_SIZE', 48)
+    chosen = random.sample(candidates, min(size, len(candidates)))
+    FeaturedProduct.objects.bulk_create([
+        FeaturedProduct(product_id=product_id, position=position)
+        for position, product_id in enumerate(chosen)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0010_product_facet_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_featured_pool, migrations.RunPython.noop),
+    ]
@@ -25,15 +25,76 @@ class Product(models.Model):
     price = models.DecimalField(max_digits=12, decimal_places=0)
     stock = models.IntegerField()
     image = models.ImageField(upload_to='products/')
+    # Diisi oleh products/images.py: ukuran JPEG/WebP dan placeholder kecil
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination (created_at, id) untuk daftar produk aktif
+            models.Index(fields=['is_active', '-created_at', '-id'], name='product_active_created_idx'),
+            # Validator ETag/Last-Modified: MAX(updated_at) per daftar / kategori
+            models.Index(fields=['is_active', 'updated_at'], name='product_active_updated_idx'),
+            models.Index(fields=['is_active', 'category', 'updated_at'], name='product_cat_updated_idx'),
+            # Filter faset: kategori + urutan terbaru, dan rentang harga
+            models.Index(fields=['is_active', 'category', '-created_at'], name='product_active_cat_created_idx'),
+            models.Index(fields=['is_active', 'price'], name='product_active_price_idx'),
+        ]
     
     def get_absolute_url(self):
         return reverse('product_detail', kwargs={'slug': self.slug})
     
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+class FeaturedProduct(models.Model):
+    """
+    Pool produk unggulan untuk beranda. Baris non-pin diacak ulang secara berkala
+    (``manage.py reshuffle_featured``), baris yang di-pin admin selalu tampil.
+    """
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, related_name='featured')
+    pinned = models.BooleanField(default=False, help_text="Produk yang di-pin selalu tampil di beranda")
+    position = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-pinned', 'position']
+        indexes = [
+            models.Index(fields=['pinned', 'position'], name='featured_pinned_position_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product.name}{' (pin)' if self.pinned else ''}"
+
+    def save(self, *args, **kwargs):
+        if self.position is None and not self.pinned:
+            # Baris non-pin yang ditambah admin ikut rotasi, di ujung pool
+            last = FeaturedProduct.objects.aggregate(last=models.Max('position'))['last']
+            self.position = 0 if last is None else last + 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'position'}
+        super().save(*args, **kwargs)
+
+
+class RelatedProduct(models.Model):
+    """
+    Indeks "sering dibeli bersama": top-K produk per produk, dibangun dari
+    riwayat OrderItem (lihat products/related.py).
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='co_purchases')
+    related = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    score = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'related'], name='unique_related_product'),
+        ]
+        indexes = [
+            models.Index(fields=['product', '-score'], name='related_product_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product} -> {self.related} ({self.score})"
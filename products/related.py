@@ -0,0 +1,108 @@
+"""
+Indeks produk terkait berdasarkan riwayat pembelian bersama (co-purchase).
+
+Setiap produk menyimpan paling banyak ``RELATED_CAPACITY`` baris. Pembaruan
+inkremental memakai algoritma space-saving: jika kapasitas penuh, pasangan
+dengan skor terkecil diganti pasangan baru dengan skor ``min + 1``, sehingga
+tabel tetap kecil tetapi produk yang benar-benar sering dibeli bersama tetap
+bertahan di atas.
+"""
+from itertools import groupby
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import Product, RelatedProduct
+
+
+def capacity():
+    return getattr(settings, 'RELATED_CAPACITY', 20)
+
+
+@transaction.atomic
+def record_co_purchase(product_ids):
+    """Tambahkan satu pesanan (daftar id produk) ke indeks."""
+    product_ids = sorted(set(product_ids))
+    if len(product_ids) < 2:
+        return
+
+    rows = RelatedProduct.objects.select_for_update().filter(product_id__in=product_ids)
+    existing = {}
+    for row in rows:
+        existing.setdefault(row.product_id, {})[row.related_id] = row
+
+    to_update, to_create, to_delete = [], [], []
+    for product_id in product_ids:
+        entries = existing.get(product_id, {})
+        for related_id in product_ids:
+            if related_id == product_id:
+                continue
+            row = entries.get(related_id)
+            if row is not None:
+                row.score += 1
+                to_update.append(row)
+            elif len(entries) < capacity():
+                row = RelatedProduct(product_id=product_id, related_id=related_id, score=1)
+                entries[related_id] = row
+                to_create.append(row)
+            else:
+                # Space-saving: ganti entri terkecil
+                weakest = min(entries.values(), key=lambda entry: entry.score)
+                del entries[weakest.related_id]
+                if weakest.pk:
+                    to_delete.append(weakest.pk)
+                else:
+                    to_create.remove(weakest)
+                row = RelatedProduct(product_id=product_id, related_id=related_id, score=weakest.score + 1)
+                entries[related_id] = row
+                to_create.append(row)
+
+    if to_delete:
+        RelatedProduct.objects.filter(pk__in=to_delete).delete()
+    RelatedProduct.objects.bulk_update([row for row in to_update if row.pk not in to_delete], ['score'])
+    RelatedProduct.objects.bulk_create(to_create)
+
+
+def rebuild_related_products(batch_size=1000):
+    """Bangun ulang seluruh indeks dari OrderItem dengan satu self-join teragregasi."""
+    from orders.models import OrderItem
+
+    table = OrderItem._meta.db_table
+    sql = (
+        f'SELECT a.product_id, b.product_id, COUNT(DISTINCT a.order_id) AS score '
+        f'FROM {table} a JOIN {table} b ON a.order_id = b.order_id AND a.product_id <> b.product_id '
+        f'GROUP BY a.product_id, b.product_id '
+        f'ORDER BY a.product_id, score DESC, b.product_id'
+    )
+    created = 0
+    with transaction.atomic():
+        RelatedProduct.objects.all().delete()
+        batch = []
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+            for product_id, pairs in groupby(cursor, key=lambda row: row[0]):
+                for _, related_id, score in list(pairs)[:capacity()]:
+                    batch.append(RelatedProduct(product_id=product_id, related_id=related_id, score=score))
+                if len(batch) >= batch_size:
+                    RelatedProduct.objects.bulk_create(batch)
+                    created += len(batch)
+                    batch = []
+        RelatedProduct.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def get_related_products(product, limit=4):
+    """Produk yang sering dibeli bersama; kategori yang sama hanya untuk mengisi kekurangan."""
+    related = [
+        row.related for row in
+        RelatedProduct.objects.filter(product=product, related__is_active=True)
+        .select_related('related').order_by('-score')[:limit]
+    ]
+    if len(related) < limit:
+        exclude = [product.id] + [item.id for item in related]
+        related += list(
+            Product.objects.filter(category_id=product.category_id, is_active=True)
+            .exclude(id__in=exclude)[:limit - len(related)]
+        )
+    return related
@@ -0,0 +1,258 @@
+"""
+Indeks pencarian produk (nama, deskripsi, dan nama kategori).
+
+Postgres memakai tabel ``tsvector`` dengan GIN index, SQLite memakai tabel
+virtual FTS5. Keduanya diakses lewat antarmuka yang sama (``get_backend``),
+sehingga view tidak perlu tahu database apa yang dipakai.
+"""
+import re
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Q
+
+from .models import Product
+
+INDEX_TABLE = 'products_productsearch'
+MAX_TOKENS = 10
+FUZZY_LIMIT = 60
+CHUNK_SIZE = 500
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    """Pecah query menjadi token aman (huruf/angka saja) untuk query FTS."""
+    return [token.lower() for token in _TOKEN_RE.findall(query or '')][:MAX_TOKENS]
+
+
+def _chunks(ids, size=CHUNK_SIZE):
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def _placeholders(values):
+    return ', '.join(['%s'] * len(values))
+
+
+class BaseSearchBackend:
+    """Antarmuka backend pencarian. Subclass mengisi SQL khusus vendor."""
+
+    id_column = 'product_id'
+    insert_sql = ''
+    count_sql = ''
+    ids_sql = ''
+
+    def build_query(self, tokens):
+        raise NotImplementedError
+
+    def index_products(self, product_ids):
+        """Tulis ulang dokumen untuk produk tertentu. Produk nonaktif dibuang dari indeks."""
+        with transaction.atomic(), connection.cursor() as cursor:
+            for chunk in _chunks(product_ids):
+                cursor.execute(
+                    f'DELETE FROM {INDEX_TABLE} WHERE {self.id_column} IN ({_placeholders(chunk)})',
+                    chunk,
+                )
+                cursor.execute(
+                    f'{self.insert_sql} WHERE p.is_active AND p.id IN ({_placeholders(chunk)})',
+                    chunk,
+                )
+
+    def remove_products(self, product_ids):
+        with connection.cursor() as cursor:
+            for chunk in _chunks(product_ids):
+                cursor.execute(
+                    f'DELETE FROM {INDEX_TABLE} WHERE {self.id_column} IN ({_placeholders(chunk)})',
+                    chunk,
+                )
+
+    def rebuild(self):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {INDEX_TABLE}')
+            cursor.execute(f'{self.insert_sql} WHERE p.is_active')
+
+    def count(self, tokens):
+        with connection.cursor() as cursor:
+            cursor.execute(self.count_sql, [self.build_query(tokens)])
+            return cursor.fetchone()[0]
+
+    def ids(self, tokens, offset, limit):
+        """Id produk terurut berdasarkan relevansi."""
+        with connection.cursor() as cursor:
+            cursor.execute(self.ids_sql, [self.build_query(tokens), limit, offset])
+            return [row[0] for row in cursor.fetchall()]
+
+    def fuzzy_ids(self, query, limit=FUZZY_LIMIT):
+        return []
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    insert_sql = (
+        f'INSERT INTO {INDEX_TABLE} (product_id, document) '
+        "SELECT p.id, "
+        "setweight(to_tsvector('simple', p.name), 'A') || "
+        "setweight(to_tsvector('simple', c.name), 'B') || "
+        "setweight(to_tsvector('simple', p.description), 'C') "
+        'FROM products_product p JOIN products_category c ON c.id = p.category_id'
+    )
+    count_sql = (
+        f"SELECT COUNT(*) FROM {INDEX_TABLE} WHERE document @@ to_tsquery('simple', %s)"
+    )
+    ids_sql = (
+        f"SELECT product_id FROM {INDEX_TABLE}, to_tsquery('simple', %s) q "
+        'WHERE document @@ q '
+        'ORDER BY ts_rank_cd(document, q) DESC, product_id DESC '
+        'LIMIT %s OFFSET %s'
+    )
+
+    def build_query(self, tokens):
+        # Prefix match untuk setiap kata, semua kata wajib ada
+        return ' & '.join(f'{token}:*' for token in tokens)
+
+    def fuzzy_ids(self, query, limit=FUZZY_LIMIT):
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        try:
+            with transaction.atomic():
+                return list(
+                    Product.objects.filter(is_active=True)
+                    .annotate(similarity=TrigramWordSimilarity(query, 'name'))
+                    .filter(similarity__gt=getattr(settings, 'SEARCH_FUZZY_THRESHOLD', 0.3))
+                    .order_by('-similarity', '-id')
+                    .values_list('id', flat=True)[:limit]
+                )
+        except DatabaseError:
+            # Ekstensi pg_trgm belum terpasang
+            return []
+
+
+class SqliteSearchBackend(BaseSearchBackend):
+    id_column = 'rowid'
+    insert_sql = (
+        f'INSERT INTO {INDEX_TABLE} (rowid, name, category, description) '
+        'SELECT p.id, p.name, c.name, p.description '
+        'FROM products_product p JOIN products_category c ON c.id = p.category_id'
+    )
+    count_sql = f'SELECT COUNT(*) FROM {INDEX_TABLE} WHERE {INDEX_TABLE} MATCH %s'
+    ids_sql = (
+        f'SELECT rowid FROM {INDEX_TABLE} WHERE {INDEX_TABLE} MATCH %s '
+        f'ORDER BY bm25({INDEX_TABLE}, 10.0, 5.0, 1.0), rowid DESC '
+        'LIMIT %s OFFSET %s'
+    )
+
+    def build_query(self, tokens):
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+    def fuzzy_ids(self, query, limit=FUZZY_LIMIT):
+        # SQLite tidak punya pg_trgm, jadi kemiripan trigram dihitung di Python
+        # (mirip word_similarity). Hanya untuk development lokal dengan katalog kecil.
+        threshold = getattr(settings, 'SEARCH_FUZZY_THRESHOLD', 0.3)
+        target = _trigrams(query)
+        if not target:
+            return []
+        scored = []
+        for product_id, name in Product.objects.filter(is_active=True).values_list('id', 'name'):
+            score = max(
+                (len(target & grams) / len(target | grams)
+                 for grams in map(_trigrams, tokenize(name))),
+                default=0,
+            )
+            if score > threshold:
+                scored.append((score, product_id))
+        scored.sort(reverse=True)
+        return [product_id for score, product_id in scored[:limit]]
+
+
+class BasicSearchBackend(BaseSearchBackend):
+    """Fallback untuk database lain: tanpa indeks, memakai icontains."""
+
+    def index_products(self, product_ids):
+        pass
+
+    def remove_products(self, product_ids):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def _queryset(self, tokens):
+        queryset = Product.objects.filter(is_active=True)
+        for token in tokens:
+            queryset = queryset.filter(
+                Q(name__icontains=token) |
+                Q(description__icontains=token) |
+                Q(category__name__icontains=token)
+            )
+        return queryset
+
+    def count(self, tokens):
+        return self._queryset(tokens).count()
+
+    def ids(self, tokens, offset, limit):
+        return list(self._queryset(tokens).values_list('id', flat=True)[offset:offset + limit])
+
+
+def _trigrams(text):
+    grams = set()
+    for word in tokenize(text):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SqliteSearchBackend,
+}
+
+
+def get_backend():
+    return BACKENDS.get(connection.vendor, BasicSearchBackend)()
+
+
+class SearchResults:
+    """
+    Hasil pencarian yang bisa langsung dipakai ``Paginator``.
+
+    Hanya satu query COUNT dan satu query id per halaman yang dijalankan;
+    jika tidak ada hasil persis, dipakai fallback trigram (fuzzy).
+    """
+
+    def __init__(self, query, backend=None):
+        self.query = query
+        self.tokens = tokenize(query)
+        self.backend = backend or get_backend()
+        self.fuzzy = False
+        self._count = None
+        self._fuzzy_ids = None
+
+    def count(self):
+        if self._count is None:
+            self._count = self.backend.count(self.tokens) if self.tokens else 0
+            if (
+                not self._count and self.tokens
+                and getattr(settings, 'SEARCH_FUZZY_FALLBACK', True)
+            ):
+                self._fuzzy_ids = self.backend.fuzzy_ids(self.query)
+                self.fuzzy = bool(self._fuzzy_ids)
+                self._count = len(self._fuzzy_ids)
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start = key.start or 0
+        stop = self.count() if key.stop is None else key.stop
+        if stop <= start:
+            return []
+        if self.fuzzy:
+            ids = self._fuzzy_ids[start:stop]
+        else:
+            ids = self.backend.ids(self.tokens, start, stop - start)
+        products = Product.objects.select_related('category').in_bulk(ids)
+        return [products[product_id] for product_id in ids if product_id in products]
@@ -0,0 +1,58 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_catalog_version
+from .featured import forget_positions
+from .images import needs_derivatives, schedule_derivatives
+from .models import Category, FeaturedProduct, Product
+from .search import get_backend
+from .suggest import mark_dirty
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, **kwargs):
+    """Perbarui indeks pencarian setelah produk disimpan"""
+    product_id = instance.pk
+    transaction.on_commit(lambda: get_backend().index_products([product_id]))
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    product_id = instance.pk
+    transaction.on_commit(lambda: get_backend().remove_products([product_id]))
+
+
+@receiver(post_save, sender=Category)
+def reindex_category(sender, instance, created, **kwargs):
+    """Nama kategori ikut diindeks, jadi produk di kategori ini perlu ditulis ulang"""
+    if created:
+        return
+    product_ids = list(instance.products.values_list('id', flat=True))
+    if product_ids:
+        transaction.on_commit(lambda: get_backend().index_products(product_ids))
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalog_cache(sender, **kwargs):
+    """Naikkan versi cache katalog setelah transaksi selesai"""
+    transaction.on_commit(bump_catalog_version)
+    # Indeks saran pencarian dibangun ulang di background
+    transaction.on_commit(mark_dirty)
+
+
+@receiver(post_save, sender=Product)
+def generate_image_derivatives(sender, instance, raw=False, **kwargs):
+    """Render thumbnail/WebP di background jika gambar produk berubah"""
+    if not raw and needs_derivatives(instance):
+        transaction.on_commit(lambda: schedule_derivatives(instance))
+
+
+@receiver(post_save, sender=FeaturedProduct)
+@receiver(post_delete, sender=FeaturedProduct)
+def invalidate_featured_positions(sender, **kwargs):
+    """Jumlah posisi pool unggulan dihitung ulang setelah pool diubah admin"""
+    transaction.on_commit(forget_positions)
@@ -0,0 +1,147 @@
+"""
+Indeks prefix in-memory untuk saran pencarian (search-as-you-type).
+
+Nama produk aktif dan kategori dinormalisasi lalu disimpan dalam satu array
+terurut; pencarian prefix cukup ``bisect`` + iterasi beberapa elemen, tanpa
+query database. Setiap kata dalam nama ikut diindeks sehingga "galaxy"
+menemukan "Samsung Galaxy S23".
+
+Indeks dihangatkan di background saat proses web mulai (``warm_up`` dari
+wsgi.py/asgi.py). Signal Product/Category dan perubahan versi cache katalog
+(dari worker gunicorn lain) memicu pembangunan ulang di thread background;
+selama itu request tetap memakai indeks lama, jadi tidak ada request yang
+menunggu build kecuali jika indeks belum ada sama sekali.
+"""
+import logging
+import threading
+import unicodedata
+from bisect import bisect_left
+
+from django.db import DatabaseError, connection
+from django.urls import reverse
+
+from .cache import catalog_version
+from .models import Category, Product
+
+MAX_SUGGESTIONS = 8
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(text.lower().split())
+
+
+class PrefixIndex:
+    def __init__(self, entries):
+        """``entries``: iterable ``(label, url, kind)``."""
+        self.items = []
+        keys = []
+        for item_id, (label, url, kind) in enumerate(entries):
+            self.items.append({'label': label, 'url': url, 'type': kind})
+            words = normalize(label).split(' ')
+            for start in range(len(words)):
+                keys.append((' '.join(words[start:]), start, item_id))
+        keys.sort()
+        self.keys = [key for key, _, _ in keys]
+        self.targets = [(start, item_id) for _, start, item_id in keys]
+
+    def search(self, prefix, limit=MAX_SUGGESTIONS):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        matches = {}
+        position = bisect_left(self.keys, prefix)
+        while position < len(self.keys) and self.keys[position].startswith(prefix):
+            start, item_id = self.targets[position]
+            # Cocok di awal nama lebih diutamakan daripada di tengah nama
+            if item_id not in matches or start < matches[item_id]:
+                matches[item_id] = start
+            position += 1
+        ranked = sorted(matches, key=lambda item_id: (matches[item_id], self.items[item_id]['label']))
+        return [self.items[item_id] for item_id in ranked[:limit]]
+
+
+_index = None
+_index_version = None
+_dirty = True
+_build_lock = threading.Lock()
+
+
+def mark_dirty():
+    global _dirty
+    _dirty = True
+    refresh_in_background()
+
+
+def build_index():
+    product_url = reverse('product_detail', kwargs={'slug': 'SLUG'})
+    category_url = reverse('product_list_by_category', kwargs={'category_slug': 'SLUG'})
+    entries = [
+        (name, category_url.replace('SLUG', slug), 'category')
+        for name, slug in Category.objects.values_list('name', 'slug')
+    ]
+    entries += [
+        (name, product_url.replace('SLUG', slug), 'product')
+        for name, slug in Product.objects.filter(is_active=True).values_list('name', 'slug').iterator()
+    ]
+    return PrefixIndex(entries)
+
+
+def _is_stale(version):
+    return _index is None or _dirty or version != _index_version
+
+
+def _rebuild(version):
+    """Dipanggil dengan ``_build_lock`` terpegang"""
+    global _index, _index_version, _dirty
+    _dirty = False
+    _index = build_index()
+    _index_version = version
+
+
+def _refresh():
+    global _dirty
+    if not _build_lock.acquire(blocking=False):
+        return
+    try:
+        version = catalog_version()
+        # Katalog bisa berubah lagi selama build: ulangi sampai mutakhir
+        while _is_stale(version):
+            _rebuild(version)
+            version = catalog_version()
+    except DatabaseError:
+        _dirty = True
+        logger.exception('Gagal membangun indeks saran pencarian')
+    finally:
+        _build_lock.release()
+        connection.close()
+
+
+def refresh_in_background():
+    """Bangun ulang indeks di thread terpisah; request tetap memakai indeks lama"""
+    if not _build_lock.locked():
+        threading.Thread(target=_refresh, name='suggest-index', daemon=True).start()
+
+
+def warm_up():
+    """Bangun indeks di background saat proses web mulai"""
+    if _index is None:
+        refresh_in_background()
+
+
+def get_index():
+    if _index is None:
+        # Belum sempat dihangatkan: request ini menunggu satu build
+        with _build_lock:
+            if _index is None:
+                _rebuild(catalog_version())
+    elif _is_stale(catalog_version()):
+        refresh_in_background()
+    return _index
+
+
+def suggest(prefix, limit=MAX_SUGGESTIONS):
+    return get_index().search(prefix, limit)
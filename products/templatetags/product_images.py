@@ -0,0 +1,49 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+
+register = template.Library()
+
+# Ukuran tampilan tiap slot, dipakai browser untuk memilih kandidat srcset
+SLOT_SIZES = {
+    'card': '(max-width: 768px) 100vw, 400px',
+    'thumb': '60px',
+    'cart': '100px',
+}
+
+
+def _srcset(entries):
+    return ', '.join(
+        f'{default_storage.url(name)} {width}w'
+        for width, name in sorted(entries.items(), key=lambda item: int(item[0]))
+    )
+
+
+@register.simple_tag
+def product_image(product, slot='card', css_class='', style=''):
+    """
+    ``<picture>`` dengan WebP + JPEG srcset dan ``loading="lazy"``.
+    Jika turunan belum dibuat, jatuh ke gambar asli.
+    """
+    if not product.image:
+        return ''
+    variants = product.image_variants or {}
+    if variants.get('source') != product.image.name or not variants.get('jpeg'):
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" style="{}" loading="lazy" decoding="async">',
+            product.image.url, product.name, css_class, style,
+        )
+
+    sizes = SLOT_SIZES.get(slot, SLOT_SIZES['card'])
+    jpeg = variants['jpeg']
+    fallback = jpeg[min(jpeg, key=int)] if slot == 'thumb' else jpeg[max(jpeg, key=int)]
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" '
+        'style="{}background: center / cover no-repeat url(\'{}\');" loading="lazy" decoding="async">'
+        '</picture>',
+        _srcset(variants.get('webp', {})), sizes,
+        default_storage.url(fallback), _srcset(jpeg), sizes,
+        product.name, css_class, style, variants.get('placeholder', ''),
+    )
@@ -1,40 +1,101 @@
 from django.shortcuts import render, get_object_or_404, redirect
+from django.http import Http404
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib import messages
 from django.urls import reverse_lazy
+from core.pagination import CursorPaginationMixin
+from . import cache as catalog_cache
+from .conditional import ConditionalGetMixin, product_list_state, product_state
+from .facets import apply_filters, facet_counts, filters_key, parse_filters, price_options
+from .related import get_related_products
 from .models import Product, Category
 
-class ProductListView(ListView):
+class ProductListView(ConditionalGetMixin, CursorPaginationMixin, ListView):
     model = Product
     template_name = 'products/product_list.html'
     context_object_name = 'products'
     paginate_by = 12
+    approximate_total = True
+    
+    def get_catalog_state(self, request, *args, **kwargs):
+        return product_list_state(kwargs.get('category_slug'))
     
     def get_queryset(self):
         queryset = Product.objects.filter(is_active=True)
+        self.category = None
         category_slug = self.kwargs.get('category_slug')
         if category_slug:
-            category = get_object_or_404(Category, slug=category_slug)
-            queryset = queryset.filter(category=category)
-        return queryset
+            self.category = catalog_cache.get_category(category_slug)
+            if self.category is None:
+                raise Http404("Kategori tidak ditemukan")
+            queryset = queryset.filter(category=self.category)
+        self.filters = parse_filters(self.request.GET)
+        return apply_filters(queryset, self.filters)
+    
+    def filter_params(self):
+        params = self.request.GET.copy()
+        params.pop(self.cursor_param, None)
+        return params
+    
+    def get_page(self, paginator, token):
+        # Halaman katalog disimpan di cache berversi, invalidasi lewat signal
+        key = catalog_cache.make_key(
+            'product_list', self.kwargs.get('category_slug', ''), filters_key(self.filters), token or ''
+        )
+        return catalog_cache.get_or_build(key, lambda: paginator.page(token), stock=self.filters['in_stock'])
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['categories'] = Category.objects.all()
+        params = self.filter_params()
+        counts = catalog_cache.get_or_build(
+            catalog_cache.make_key('facets', self.kwargs.get('category_slug', ''), filters_key(self.filters)),
+            lambda: facet_counts(self.filters, self.category),
+            stock=True,
+        )
+        categories = catalog_cache.get_categories()
+        for category in categories:
+            category.facet_count = counts['categories'].get(category.id, 0)
+        
+        stock_params = params.copy()
+        if self.filters['in_stock']:
+            stock_params.pop('in_stock', None)
+        else:
+            stock_params['in_stock'] = '1'
+        
+        context.update({
+            'categories': categories,
+            'current_category': self.category,
+            'filters': self.filters,
+            'filter_query': params.urlencode(),
+            'price_options': price_options(self.filters, counts, params),
+            'in_stock_count': counts['in_stock'],
+            'in_stock_query': stock_params.urlencode(),
+            'facets': True,
+        })
         return context
 
-class ProductDetailView(DetailView):
+class ProductDetailView(ConditionalGetMixin, DetailView):
     model = Product
     template_name = 'products/product_detail.html'
     context_object_name = 'product'
     
+    def get_catalog_state(self, request, *args, **kwargs):
+        return product_state(kwargs.get('slug'))
+    
+    def get_object(self, queryset=None):
+        product = catalog_cache.get_product(self.kwargs.get(self.slug_url_kwarg))
+        if product is None:
+            raise Http404("Produk tidak ditemukan")
+        return product
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['related_products'] = Product.objects.filter(
-            category=self.object.category,
-            is_active=True
-        ).exclude(id=self.object.id)[:4]
+        # Indeks co-purchase, kategori yang sama hanya untuk produk yang belum pernah dibeli
+        context['related_products'] = catalog_cache.get_or_build(
+            catalog_cache.make_key('related', self.object.id),
+            lambda: get_related_products(self.object, 4)
+        )
         return context
 
 class ProductCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):